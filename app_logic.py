@@ -3,12 +3,13 @@ import pandas as pd
 from PyQt5 import QtCore, QtWidgets
 from collections import Counter
 from datetime import datetime
-from ui_widgets import SortableTreeWidgetItem
+from ui_widgets import SortableTreeWidgetItem, QtBulkUpdate
 import os
 import re
 import json
 import locale
 from search_engine import SearchEngine
+from timeline_canvas import LogDataHandle
 
 class AppLogic(QtCore.QObject):
     def __init__(self, main_window, status_bar):
@@ -24,6 +25,8 @@ class AppLogic(QtCore.QObject):
         self.current_search_text = ""
         self.active_filter_name = "No Filter"
         self.active_filter_loggers = set()
+        self._message_type_match_cache = None # (search_text, source DataFrame, matching logger names)
+        self._checked_types = set() # Shadow of the checked message_types_tree items, kept in sync on every check change
 
         # --- Full-Text Search Engine ---
         self.search_engine = SearchEngine()
@@ -32,6 +35,14 @@ class AppLogic(QtCore.QObject):
         self.global_search_timer.setSingleShot(True)
         self.global_search_timer.timeout.connect(self._apply_search_filter_and_update_views)
 
+        # --- Coalesced timeline updates ---
+        # Bursts of selection/granularity changes only push the last configuration to the timeline.
+        self._pending_timeline_config = None # (selected message types, granularity)
+        self._update_timer = QtCore.QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(50)
+        self._update_timer.timeout.connect(self._do_timeline_update)
+
     def update_indexing_progress(self, current, total):
         """Update the status bar with indexing progress."""
         if self.status_bar:
@@ -39,13 +50,20 @@ class AppLogic(QtCore.QObject):
             self.status_bar.showMessage(f"Indexing for search... {progress:.0f}%")
             QtCore.QCoreApplication.processEvents() # Force UI update
 
-    def set_full_log_data(self, df, enable_full_text_indexing):
-        """Passes the full DataFrame to the timeline canvas and indexes it for search if enabled."""
+    def set_full_log_data(self, df, enable_full_text_indexing, search_engine=None):
+        """Passes the full DataFrame to the timeline canvas and indexes it for search if enabled.
+
+        search_engine is an index the loader already built while parsing; it is adopted as is.
+        """
         if self.mw.timeline_canvas:
-            self.mw.timeline_canvas.set_full_log_data(df)
+            self.mw.timeline_canvas.set_full_log_data(LogDataHandle.from_dataframe(df))
 
         # Conditionally index data for FTS
-        if enable_full_text_indexing and df is not None and not df.empty:
+        if enable_full_text_indexing and search_engine is not None and search_engine.is_indexed and df is not None and not df.empty:
+            self.search_engine.close()
+            self.search_engine = search_engine
+            self.status_bar.showMessage("Indexing complete.", 3000)
+        elif enable_full_text_indexing and df is not None and not df.empty:
             try:
                 self.status_bar.showMessage("Preparing data for search indexing...", 0)
                 QtCore.QCoreApplication.processEvents()
@@ -263,6 +281,10 @@ class AppLogic(QtCore.QObject):
             self.message_types_data_for_list = pd.DataFrame(columns=['logger_name', 'count'])
         else:
             logger_counts_series = df_to_process['logger_name'].value_counts()
+            # Categorical value_counts also lists loggers absent from the filtered rows
+            logger_counts_series = logger_counts_series[logger_counts_series > 0]
+            if isinstance(logger_counts_series.index, pd.CategoricalIndex):
+                logger_counts_series.index = logger_counts_series.index.astype(str)
             search_text = self.mw.message_type_search_input.text().lower() if self.mw.message_type_search_input else ""
             if search_text:
                 if not logger_counts_series.empty and pd.api.types.is_string_dtype(logger_counts_series.index.dtype):
@@ -279,28 +301,40 @@ class AppLogic(QtCore.QObject):
 
         if self.mw.message_types_tree:
             tree = self.mw.message_types_tree
-            tree.clear()
-            tree.setSortingEnabled(False)
-            items = []
-            for _, row in self.message_types_data_for_list.iterrows():
-                item = SortableTreeWidgetItem([str(row['logger_name']), str(int(row['count']))])
-                item.setCheckState(0, QtCore.Qt.Unchecked)
-                items.append(item)
-            tree.addTopLevelItems(items)
-            tree.setSortingEnabled(True)
+            with QtBulkUpdate(tree):
+                tree.clear()
+                self._checked_types.clear() # Every rebuilt item starts unchecked
+                tree.setSortingEnabled(False)
+                items = []
+                for _, row in self.message_types_data_for_list.iterrows():
+                    count = int(row['count'])
+                    item = SortableTreeWidgetItem([str(row['logger_name']), str(count)])
+                    item.set_sort_key(1, count)
+                    item.setCheckState(0, QtCore.Qt.Unchecked)
+                    items.append(item)
+                tree.addTopLevelItems(items)
+                tree.setSortingEnabled(True)
             if select_all_visible:
                 self.set_check_state_for_visible_types(QtCore.Qt.Checked)
 
     def trigger_timeline_update_from_selection(self):
         if self.mw._is_batch_updating_ui or not self.mw.timeline_canvas: return
-        selected_types = set()
-        if self.mw.message_types_tree:
-            for i in range(self.mw.message_types_tree.topLevelItemCount()):
-                item = self.mw.message_types_tree.topLevelItem(i)
-                if item.checkState(0) == QtCore.Qt.Checked:
-                    selected_types.add(item.text(0))
+        selected_types = self._get_checked_message_types()
 
         granularity = self.mw.granularity_combo.currentText() if self.mw.granularity_combo else 'minute'
+        self._schedule_timeline_update(selected_types, granularity)
+
+    def _schedule_timeline_update(self, selected_types, granularity):
+        """Queues a timeline configuration; restarting the timer coalesces rapid changes into one update."""
+        self._pending_timeline_config = (selected_types, granularity)
+        self._update_timer.start()
+
+    def _do_timeline_update(self):
+        if self._pending_timeline_config is None or not self.mw.timeline_canvas: return
+        selected_types, granularity = self._pending_timeline_config
+        self._pending_timeline_config = None
+        if self.mw.granularity_combo:
+            granularity = self.mw.granularity_combo.currentText() # The combo may have changed since scheduling
         self.mw.timeline_canvas.update_display_config(selected_types, granularity)
 
     def on_granularity_changed(self):
@@ -363,30 +397,75 @@ class AppLogic(QtCore.QObject):
 
     def apply_message_type_filter(self):
         if not self.mw.message_types_tree or not self.mw.message_type_search_input: return
-        search_text = self.mw.message_type_search_input.text().lower()
-        for i in range(self.mw.message_types_tree.topLevelItemCount()):
-            item = self.mw.message_types_tree.topLevelItem(i)
-            item.setHidden(bool(search_text and search_text not in item.text(0).lower()))
+        search_text = self.mw.message_type_search_input.text()
+        matching_names = self._get_matching_message_type_names(search_text) if search_text else None
+        tree = self.mw.message_types_tree
+        with QtBulkUpdate(tree):
+            for i in range(tree.topLevelItemCount()):
+                item = tree.topLevelItem(i)
+                hidden = matching_names is not None and item.text(0) not in matching_names
+                if item.isHidden() != hidden: # Only touch rows whose visibility actually changes
+                    item.setHidden(hidden)
         # The visibility of items in the tree has changed, which affects what _apply_filters_and_update_views considers.
         self._apply_filters_and_update_views(refresh_filter_categories=False)
 
+    def _get_matching_message_type_names(self, search_text):
+        """Returns the set of logger names containing search_text (case-insensitive).
+        The match mask is computed once per search text and loaded dataset."""
+        cached = self._message_type_match_cache
+        if cached and cached[0] == search_text and cached[1] is self.mw.log_entries_full:
+            return cached[2]
+        log_entries = self.mw.log_entries_full
+        if log_entries.empty or 'logger_name' not in log_entries.columns:
+            return set() # No data loaded: nothing can match
+        # Match once against the deduplicated logger names (categories) instead of every tree item.
+        logger_col = log_entries['logger_name']
+        if isinstance(logger_col.dtype, pd.CategoricalDtype):
+            names = logger_col.cat.categories.astype(str)
+        else:
+            names = pd.Index(logger_col.dropna().unique()).astype(str)
+        visible_mask = names.str.contains(search_text, case=False, regex=False, na=False)
+        matching_names = set(names[visible_mask])
+        self._message_type_match_cache = (search_text, self.mw.log_entries_full, matching_names)
+        return matching_names
+
+    def _get_checked_message_types(self, visible_only=False):
+        """Returns the names of the checked message types from the shadow set, without walking the tree.
+        With visible_only, types hidden by the message type search filter are left out."""
+        if not self.mw.message_types_tree:
+            return set()
+        if visible_only:
+            search_text = self.mw.message_type_search_input.text() if self.mw.message_type_search_input else ""
+            if search_text:
+                return self._checked_types & self._get_matching_message_type_names(search_text)
+        return set(self._checked_types)
+
+    def _set_message_type_check_state(self, item, check_state):
+        if item.checkState(0) != check_state:
+            item.setCheckState(0, check_state)
+        if check_state == QtCore.Qt.Checked:
+            self._checked_types.add(item.text(0))
+        else:
+            self._checked_types.discard(item.text(0))
+
     def on_message_type_item_changed(self, item, column):
+        # Keep the shadow set in sync even during batch updates, which only defer the view refresh.
+        if item.checkState(0) == QtCore.Qt.Checked:
+            self._checked_types.add(item.text(0))
+        else:
+            self._checked_types.discard(item.text(0))
+
         if not self.mw._is_batch_updating_ui:
             # A change in the message type tree selection is a filter change.
             self._apply_filters_and_update_views(refresh_filter_categories=False)
             
             # Also, the timeline needs to be updated based on the new selection of message types.
-            selected_types_for_timeline = set()
-            if self.mw.message_types_tree:
-                for i in range(self.mw.message_types_tree.topLevelItemCount()):
-                    tree_item = self.mw.message_types_tree.topLevelItem(i)
-                    # Consider only items that are checked AND not hidden by the message type search filter
-                    if tree_item.checkState(0) == QtCore.Qt.Checked and not tree_item.isHidden():
-                        selected_types_for_timeline.add(tree_item.text(0))
+            # Consider only types that are checked AND not hidden by the message type search filter
+            selected_types_for_timeline = self._get_checked_message_types(visible_only=True)
             
             current_granularity = self.mw.granularity_combo.currentText() if self.mw.granularity_combo else 'minute'
             if self.mw.timeline_canvas:
-                self.mw.timeline_canvas.update_display_config(selected_types_for_timeline, current_granularity)
+                self._schedule_timeline_update(selected_types_for_timeline, current_granularity)
 
     def on_global_search_changed(self, text):
         """Handle changes from the global search box with debouncing."""
@@ -451,16 +530,9 @@ class AppLogic(QtCore.QObject):
             self._rebuild_message_types_data_and_list(source_df=current_df.copy())
 
         # 4. Filter by selected message types in the list
-        selected_types = set()
-        is_any_type_checked = False
-        if self.mw.message_types_tree:
-            for i in range(self.mw.message_types_tree.topLevelItemCount()):
-                item = self.mw.message_types_tree.topLevelItem(i)
-                if item.checkState(0) == QtCore.Qt.Checked:
-                    is_any_type_checked = True
-                    selected_types.add(item.text(0))
+        selected_types = self._get_checked_message_types()
         
-        if is_any_type_checked:
+        if selected_types:
              current_df = current_df[current_df['logger_name'].isin(selected_types)]
 
         # 5. Filter by main search widget text (self.current_search_text)
@@ -483,7 +555,7 @@ class AppLogic(QtCore.QObject):
         # Finally, update the timeline view with the currently selected types
         if self.mw.timeline_canvas:
             granularity = self.mw.granularity_combo.currentText() if self.mw.granularity_combo else 'minute'
-            self.mw.timeline_canvas.update_display_config(selected_types, granularity)
+            self._schedule_timeline_update(selected_types, granularity)
 
     def _fetch_full_log_entry(self, metadata_entry):
         source_file_path = metadata_entry.get('source_file_path')
@@ -545,37 +617,26 @@ class AppLogic(QtCore.QObject):
         self._navigate_message(1)
 
     def _navigate_message(self, direction):
-        selected_items = self.mw.selected_messages_list.selectedItems()
-        if not selected_items:
+        messages_list = self.mw.selected_messages_list
+        current_row = messages_list.current_row()
+        if current_row < 0:
             return
 
-        current_item = selected_items[0]
-        current_logger = current_item.text(2)  # Logger is in column 2
-        current_index = self.mw.selected_messages_list.indexOfTopLevelItem(current_item)
-
-        start_index = current_index + direction
-        if direction == -1:
-            search_range = range(start_index, -1, -1)
-        else:
-            search_range = range(start_index, self.mw.selected_messages_list.topLevelItemCount())
-
-        for i in search_range:
-            item = self.mw.selected_messages_list.topLevelItem(i)
-            if item and item.text(2) == current_logger:
-                self.mw.selected_messages_list.setCurrentItem(item)
-                self.mw.selected_messages_list.scrollToItem(item, QtWidgets.QAbstractItemView.PositionAtCenter)
-                return
+        target_row = messages_list.find_row_with_same_logger(current_row, direction)
+        if target_row >= 0:
+            messages_list.select_row(target_row)
 
     def on_message_selected(self):
         if not self.mw.selected_messages_list or not self.mw.details_text: return
-        selected_items = self.mw.selected_messages_list.selectedItems()
-        if not selected_items:
+        messages_list = self.mw.selected_messages_list
+        current_row = messages_list.current_row()
+        if current_row < 0:
             self.mw.details_text.clear()
             self.mw.prev_message_button.setEnabled(False)
             self.mw.next_message_button.setEnabled(False)
             return
         
-        metadata_entry = selected_items[0].data(0, QtCore.Qt.UserRole)
+        metadata_entry = messages_list.selected_entry()
         if not metadata_entry or not isinstance(metadata_entry, dict):
             self.mw.details_text.setPlainText("Error: Invalid or no metadata associated with selected item.")
             return
@@ -583,28 +644,9 @@ class AppLogic(QtCore.QObject):
         full_message_content = self._fetch_full_log_entry(metadata_entry)
         self.mw.details_text.setPlainText(full_message_content)
 
-        # Update navigation button states
-        selected_item = selected_items[0]
-        current_logger = selected_item.text(2)
-        current_index = self.mw.selected_messages_list.indexOfTopLevelItem(selected_item)
-
-        # Check for previous
-        has_prev = False
-        for i in range(current_index - 1, -1, -1):
-            item = self.mw.selected_messages_list.topLevelItem(i)
-            if item and item.text(2) == current_logger:
-                has_prev = True
-                break
-        self.mw.prev_message_button.setEnabled(has_prev)
-
-        # Check for next
-        has_next = False
-        for i in range(current_index + 1, self.mw.selected_messages_list.topLevelItemCount()):
-            item = self.mw.selected_messages_list.topLevelItem(i)
-            if item and item.text(2) == current_logger:
-                has_next = True
-                break
-        self.mw.next_message_button.setEnabled(has_next)
+        # Update navigation button states: is there another message from the same logger before/after?
+        self.mw.prev_message_button.setEnabled(messages_list.find_row_with_same_logger(current_row, -1) >= 0)
+        self.mw.next_message_button.setEnabled(messages_list.find_row_with_same_logger(current_row, 1) >= 0)
 
     def _get_currently_visible_message_types_sorted_by_count(self):
         if not self.mw.message_types_tree: return []
@@ -638,13 +680,14 @@ class AppLogic(QtCore.QObject):
         self.mw._enter_batch_update()
         try:
             tree = self.mw.message_types_tree
-            for i in range(tree.topLevelItemCount()):
-                item = tree.topLevelItem(i)
-                logger_name = item.text(0)
-                if logger_name in top_types_set:
-                    item.setCheckState(0, QtCore.Qt.Checked)
-                else:
-                    item.setCheckState(0, QtCore.Qt.Unchecked)
+            with QtBulkUpdate(tree):
+                for i in range(tree.topLevelItemCount()):
+                    item = tree.topLevelItem(i)
+                    logger_name = item.text(0)
+                    if logger_name in top_types_set:
+                        self._set_message_type_check_state(item, QtCore.Qt.Checked)
+                    else:
+                        self._set_message_type_check_state(item, QtCore.Qt.Unchecked)
         finally:
             self.mw._exit_batch_update()
         self.trigger_timeline_update_from_selection()
@@ -658,24 +701,21 @@ class AppLogic(QtCore.QObject):
     def set_check_state_for_all_types(self, check_state):
         if self.mw._is_batch_updating_ui or not self.mw.message_types_tree: return
         self.mw._enter_batch_update()
-        self.mw.message_types_tree.blockSignals(True)
-        for i in range(self.mw.message_types_tree.topLevelItemCount()):
-            item = self.mw.message_types_tree.topLevelItem(i)
-            if item.checkState(0) != check_state:
-                item.setCheckState(0, check_state)
-        self.mw.message_types_tree.blockSignals(False)
+        with QtBulkUpdate(self.mw.message_types_tree):
+            for i in range(self.mw.message_types_tree.topLevelItemCount()):
+                item = self.mw.message_types_tree.topLevelItem(i)
+                self._set_message_type_check_state(item, check_state)
         self.mw._exit_batch_update()
         self.trigger_timeline_update_from_selection()
 
     def set_check_state_for_visible_types(self, check_state):
         if self.mw._is_batch_updating_ui or not self.mw.message_types_tree: return
         self.mw._enter_batch_update()
-        self.mw.message_types_tree.blockSignals(True)
-        for i in range(self.mw.message_types_tree.topLevelItemCount()):
-            item = self.mw.message_types_tree.topLevelItem(i)
-            if not item.isHidden():
-                if item.checkState(0) != check_state: item.setCheckState(0, check_state)
-        self.mw.message_types_tree.blockSignals(False)
+        with QtBulkUpdate(self.mw.message_types_tree):
+            for i in range(self.mw.message_types_tree.topLevelItemCount()):
+                item = self.mw.message_types_tree.topLevelItem(i)
+                if not item.isHidden():
+                    self._set_message_type_check_state(item, check_state)
         self.mw._exit_batch_update()
         self.trigger_timeline_update_from_selection()
 
@@ -701,16 +741,11 @@ class AppLogic(QtCore.QObject):
         
         # Update the timeline display based on the new selection of message types (which were rebuilt)
         # and current granularity.
-        selected_types_for_timeline = set()
-        if self.mw.message_types_tree:
-            for i in range(self.mw.message_types_tree.topLevelItemCount()):
-                item = self.mw.message_types_tree.topLevelItem(i)
-                if item.checkState(0) == QtCore.Qt.Checked: # Should be all visible types after rebuild
-                    selected_types_for_timeline.add(item.text(0))
+        selected_types_for_timeline = self._get_checked_message_types() # Should be all visible types after rebuild
         
         current_granularity = self.mw.granularity_combo.currentText() if self.mw.granularity_combo else 'minute'
         if self.mw.timeline_canvas:
-            self.mw.timeline_canvas.update_display_config(selected_types_for_timeline, current_granularity)
+            self._schedule_timeline_update(selected_types_for_timeline, current_granularity)
 
     def apply_date_filter_to_timeline(self):
         date_range = getattr(self.mw, 'date_filter_range', None)
@@ -729,20 +764,15 @@ class AppLogic(QtCore.QObject):
             filtered_df = self.mw.log_entries_full[mask]
 
         if self.mw.timeline_canvas:
-            self.mw.timeline_canvas.set_full_log_data(filtered_df)
+            self.mw.timeline_canvas.set_full_log_data(LogDataHandle.from_dataframe(filtered_df))
 
     def set_granularity(self, granularity):
         # Update the timeline granularity and refresh the view
         if hasattr(self.mw, 'timeline_canvas') and self.mw.timeline_canvas:
             self.mw.timeline_canvas.current_time_granularity = granularity
             # Refresh the plot with selected types
-            selected_types = set()
-            if self.mw.message_types_tree:
-                for i in range(self.mw.message_types_tree.topLevelItemCount()):
-                    item = self.mw.message_types_tree.topLevelItem(i)
-                    if item.checkState(0) == QtCore.Qt.Checked:
-                        selected_types.add(item.text(0))
-            self.mw.timeline_canvas.update_display_config(selected_types, granularity)
+            selected_types = self._get_checked_message_types()
+            self._schedule_timeline_update(selected_types, granularity)
 
     def pan_timeline_left(self):
         self._pan_timeline(direction=-1)
@@ -755,7 +785,7 @@ class AppLogic(QtCore.QObject):
             QtWidgets.QMessageBox.information(self.mw, "No Data", "Please load a log file first.")
             return
 
-        selected_types = {item.text(0) for item in self.mw.message_types_tree.findItems("*", QtCore.Qt.MatchWildcard | QtCore.Qt.MatchRecursive) if item.checkState(0) == QtCore.Qt.Checked}
+        selected_types = self._get_checked_message_types()
 
         if not selected_types:
             QtWidgets.QMessageBox.information(self.mw, "No Selection", "Please select at least one message type to export.")
@@ -780,7 +810,7 @@ class AppLogic(QtCore.QObject):
             df_filtered['period_date'] = dts.dt.floor('T')
 
         # Group by the new period and logger name, then count
-        export_data = df_filtered.groupby(['period_date', 'logger_name']).size().reset_index(name='total_count')
+        export_data = df_filtered.groupby(['period_date', 'logger_name'], observed=True).size().reset_index(name='total_count')
 
         # Sort for readability
         export_data.sort_values(by=['period_date', 'logger_name'], inplace=True)
@@ -798,7 +828,7 @@ class AppLogic(QtCore.QObject):
 
     def save_current_selection_as_filter(self):
         """Saves the currently checked message types to a JSON filter file."""
-        selected_types = {item.text(0) for item in self.mw.message_types_tree.findItems("*", QtCore.Qt.MatchWildcard | QtCore.Qt.MatchRecursive) if item.checkState(0) == QtCore.Qt.Checked}
+        selected_types = self._get_checked_message_types()
 
         if not selected_types:
             QtWidgets.QMessageBox.warning(self.mw, "No Selection", "Please select at least one message type to save as a filter.")
@@ -826,7 +856,7 @@ class AppLogic(QtCore.QObject):
         """Receives the filter data from the dialog and applies it."""
         self.active_filter_name = filter_name
         self.active_filter_loggers = set(loggers)
-        self.mw.settings.setValue("active_filter_name", filter_name) # Save to settings
+        self.mw._mark_settings_dirty()
         self.mw.active_filter_label.setText(f"Filter: {self.active_filter_name}")
         self.mw.active_filter_label.setToolTip(f"Active loggers: {', '.join(loggers)}")
         if not silent:
@@ -836,7 +866,7 @@ class AppLogic(QtCore.QObject):
         """Clears the currently active filter."""
         self.active_filter_name = "No Filter"
         self.active_filter_loggers = set()
-        self.mw.settings.setValue("active_filter_name", "No Filter") # Save to settings
+        self.mw._mark_settings_dirty()
         self.mw.active_filter_label.setText("Filter: No Filter")
         self.mw.active_filter_label.setToolTip("No pre-load filter is active.")
 
@@ -1,7 +1,7 @@
 # archive_selection_dialog.py
 
 from PyQt5 import QtWidgets, QtCore, QtGui
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import re
 import os
 import zipfile
@@ -209,7 +209,7 @@ class ArchiveSelectionDialog(QtWidgets.QDialog):
 
                     if match:
                         log_type, date_str, _ = match.groups()
-                        log_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+                        log_date = date.fromisoformat(date_str) # C fast path; the pattern guarantees YYYY-MM-DD
                         self.file_items.append({'name': member_info.filename, 'type': log_type, 'date': log_date})
                         if max_date is None or log_date > max_date:
                             max_date = log_date
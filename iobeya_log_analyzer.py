@@ -5,6 +5,7 @@ import os
 import shutil
 import tempfile
 import locale
+import multiprocessing
 from datetime import datetime, timedelta, timezone
 from collections import defaultdict, Counter
 from PyQt5 import QtWidgets, QtGui, QtCore
@@ -13,8 +14,8 @@ import pandas as pd
 
 # Local imports
 from timeline_canvas import TimelineCanvas
-from log_processing import LogLoaderThread
-from ui_widgets import SortableTreeWidgetItem, LoadingDialog, VirtualTreeWidget, SearchWidget
+from log_processing import LogLoaderThread, LogCacheWriterThread, parsed_log_cache_path, load_cached_log_dataframe, EMPTY_LOG_DF
+from ui_widgets import SortableTreeWidgetItem, LoadingDialog, VirtualTreeWidget, SearchWidget, QtBulkUpdate
 from statistics_dialog import StatsDialog
 from app_logic import AppLogic # Added import
 from archive_selection_dialog import ArchiveSelectionDialog
@@ -22,12 +23,15 @@ from filter_dialog import FilterManagementDialog
 from filter_crud_dialog import FilterCRUDDialog
 from welcome_dialog import WelcomeDialog
 
+# Resolved once per process; used as the default directory for file dialogs.
+_HOME = os.path.expanduser("~")
+
 class LogAnalyzerApp(QtWidgets.QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("iObeya Log Analyzer - Version 8.0")
         self.resize(1600, 1000)
-        self.log_entries_full = pd.DataFrame() # Initialize as DataFrame
+        self.log_entries_full = EMPTY_LOG_DF.copy(deep=False)
         self.message_types_data_for_list = {}
         self.selected_log_levels = {'INFO': False, 'WARN': False, 'ERROR': False, 'DEBUG': False}
         # self.top_loggers_for_selection_buttons = [] # This will be dynamically generated now
@@ -38,6 +42,8 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
         self._is_batch_updating_ui = False
         self.loading_dialog = None
         self.loader_thread = None
+        self.cache_writer_thread = None
+        self._pending_cache_path = None # Where to cache the result of the load in progress
         self.current_loaded_source_name = "No file loaded"
         self.loaded_source_type = None
         self.current_temp_dir = None
@@ -46,11 +52,16 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
         self.loading_cancelled_by_user = False
 
         # --- Persistent Settings ---
-        self.settings = QSettings("MyCompany", "TimelineLogAnalyzer")
-        self.last_log_directory = os.path.expanduser("~")
-        self.last_filter_directory = os.path.expanduser("~")
+        self.settings = QSettings("MyCompany", "TimelineLogAnalyzer") # The only instance; every read/write goes through it
+        self.last_log_directory = _HOME
+        self.last_filter_directory = _HOME
         self.recent_files = []
         self.MAX_RECENT_FILES = 10
+        self._settings_dirty = False # Persisted in one batch, see request_save_settings()
+        self._save_timer = QtCore.QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(150) # Only the last state of a burst of changes hits the disk
+        self._save_timer.timeout.connect(self.save_settings)
 
 
 
@@ -219,7 +230,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
         self.granularity_combo = QtWidgets.QComboBox()
         self.granularity_combo.addItems(['minute', 'hour', 'day', 'week'])
         self.granularity_combo.setCurrentText('minute')
-        self.granularity_combo.currentTextChanged.connect(self.on_granularity_changed)
+        self.granularity_combo.currentTextChanged.connect(self.app_logic.on_granularity_changed)
         controls_layout.addWidget(self.granularity_combo)
 
         # Add a spacer for visual separation
@@ -310,6 +321,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
         self.message_types_tree = QtWidgets.QTreeWidget()
         self.message_types_tree.setHeaderLabels(['Message Type', 'Count']);
         self.message_types_tree.setSortingEnabled(True)
+        self.message_types_tree.setUniformRowHeights(True)
         self.message_types_tree.setSelectionMode(
             QtWidgets.QAbstractItemView.ExtendedSelection)
         self.message_types_tree.itemChanged.connect(self.app_logic.on_message_type_item_changed)
@@ -333,9 +345,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
         self.selected_messages_list = VirtualTreeWidget()
         self.selected_messages_list.setHeaderLabels(['Time', 'Level', 'Logger', 'Message'])
         self.selected_messages_list.itemSelectionChanged.connect(self.app_logic.on_message_selected)
-        self.selected_messages_list.current_sort_column = 0;
-        self.selected_messages_list.current_sort_order = QtCore.Qt.AscendingOrder
-        self.selected_messages_list.header().setSortIndicator(0, QtCore.Qt.AscendingOrder)
+        self.selected_messages_list.sortByColumn(0, QtCore.Qt.AscendingOrder)
         layout.addWidget(self.selected_messages_list)
 
         # --- Message Details Section with Navigation ---
@@ -378,16 +388,24 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
         # Reset cancellation flag for the new loading process
         self.loading_cancelled_by_user = False
 
-        if archive_path:
-            self.current_loaded_source_name = os.path.basename(archive_path)
-            self.loaded_source_type = "archive"
-        elif file_path:
-            self.current_loaded_source_name = os.path.basename(file_path)
-            self.loaded_source_type = "single_file"
+        if path_to_add:
+            self.current_loaded_source_name = os.path.basename(path_to_add)
+            self.loaded_source_type = "archive" if archive_path else "single_file"
         else:
             self.current_loaded_source_name = "Unknown Source"
             self.loaded_source_type = None
 
+        # Reopening an unchanged source with the same options skips parsing entirely
+        self._pending_cache_path = None
+        if path_to_add:
+            cache_path = parsed_log_cache_path(path_to_add, selected_files, self.app_logic.active_filter_loggers)
+            cached_df = load_cached_log_dataframe(cache_path)
+            if cached_df is not None:
+                self.statusBar().showMessage(f"Loaded {self.current_loaded_source_name} from cache.", 5000)
+                self.on_log_data_loaded(cached_df, [], False, enable_full_text_indexing)
+                return
+            self._pending_cache_path = cache_path
+
         self.loading_dialog = LoadingDialog(self)
 
         active_filter_name = self.app_logic.get_active_filter_name()
@@ -410,7 +428,8 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
         self.loader_thread.total_progress_update.connect(self.loading_dialog.set_total_progress_value)
         self.loader_thread.message_count_update.connect(self.loading_dialog.update_message_count)
         
-        self.loader_thread.finished_loading.connect(lambda df, summary, cancelled: self.on_log_data_loaded(df, summary, cancelled, enable_full_text_indexing))
+        loader_thread = self.loader_thread
+        self.loader_thread.finished_loading.connect(lambda df, summary, cancelled: self.on_log_data_loaded(df, summary, cancelled, enable_full_text_indexing, loader_thread.search_engine))
         self.loader_thread.error_occurred.connect(self.on_load_error)
         self.loader_thread.finished.connect(self.on_load_finished)
 
@@ -498,6 +517,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
         file_path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Open Log File", self.last_log_directory, "Log Files (*.log *.txt *.log.gz);;All Files (*)")
         if not file_path: return
         self.last_log_directory = os.path.dirname(file_path)
+        self._mark_settings_dirty()
         self._initiate_loading_process(file_path=file_path)
 
     def load_log_archive(self):
@@ -506,6 +526,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
             return
 
         self.last_log_directory = os.path.dirname(archive_path)
+        self._mark_settings_dirty()
         dialog = ArchiveSelectionDialog(archive_path, self)
         if dialog.exec_():
             selected_files = dialog.get_selected_files()
@@ -515,7 +536,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
             else:
                 QtWidgets.QMessageBox.information(self, "No Files Selected", "You did not select any files to load.")
 
-    def on_log_data_loaded(self, log_entries_df, failed_files_summary, was_cancelled_by_thread, enable_full_text_indexing):
+    def on_log_data_loaded(self, log_entries_df, failed_files_summary, was_cancelled_by_thread, enable_full_text_indexing, search_engine=None):
         # Always close the loading dialog first
         if self.loading_dialog:
             self.loading_dialog.accept()
@@ -538,7 +559,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
 
             if reply == QtWidgets.QMessageBox.No:
                 self.statusBar().showMessage("Loading cancelled. Discarded partial data.", 5000)
-                self.log_entries_full = pd.DataFrame() # Clear data
+                self.log_entries_full = EMPTY_LOG_DF.copy(deep=False) # Clear data
                 # Update canvas and UI with empty data
                 self.app_logic.set_full_log_data(self.log_entries_full, enable_full_text_indexing)
                 self.app_logic.reset_all_filters_and_view(initial_load=True)
@@ -547,6 +568,14 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
         # --- If we reach here, we are proceeding with loading the data (full or partial) ---
         self.log_entries_full = log_entries_df
 
+        # Cache complete, successful loads only; a partial result must not be replayed later.
+        # Entries read from extracted archive members or .gz files point into the temp dir, which the
+        # next load removes, so load_cached_log_dataframe would always reject them: don't write those.
+        if (self._pending_cache_path and not was_cancelled and not failed_files_summary and not log_entries_df.empty
+                and not self._has_temp_dir_sources(log_entries_df)):
+            self._start_cache_writer(log_entries_df, self._pending_cache_path)
+        self._pending_cache_path = None
+
         # Update status bar based on what happened
         if not self.log_entries_full.empty:
             if was_cancelled:
@@ -564,7 +593,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
             self.source_label.setText(f"Source: {self.current_loaded_source_name} ({source_type_str})")
 
         # Pass data to AppLogic/Canvas and reset the entire view, which triggers the timeline plot.
-        self.app_logic.set_full_log_data(self.log_entries_full, enable_full_text_indexing)
+        self.app_logic.set_full_log_data(self.log_entries_full, enable_full_text_indexing, search_engine)
         self.app_logic.reset_all_filters_and_view(initial_load=True)
 
         # Finally, show a summary of any files that failed to load
@@ -612,6 +641,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
         if self.loading_dialog and self.loading_dialog.isVisible(): self.loading_dialog.reject()
         if self.loader_thread and self.loader_thread.isRunning():
             self.loader_thread.stop() # Request thread to stop
+            self.loader_thread.wait_for_indexer() # Must not outlive the loader while running
             if not self.loader_thread.wait(1000): # Wait a bit for graceful exit
                 self.loader_thread.terminate() # Force terminate if not stopping
         
@@ -619,7 +649,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
 
         self._cleanup_temp_dir()  # Clean up temp files on error
 
-        self.log_entries_full = pd.DataFrame() # Clear any partial data
+        self.log_entries_full = EMPTY_LOG_DF.copy(deep=False) # Clear any partial data
         self.current_loaded_source_name = "Error during load"
         self.setWindowTitle("iObeya Log Analyzer - Version 8.0 - Error")
 
@@ -666,23 +696,23 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
                 if item.checkState(0) == QtCore.Qt.Checked:
                     current_checked_texts.add(item.text(0))
 
-        self.message_types_tree.blockSignals(True);
-        self.message_types_tree.clear();
-        items_to_add = []
-        for logger_name, data in self.message_types_data_for_list.items():
-            if data['count'] > 0:
-                item = SortableTreeWidgetItem([logger_name, str(data['count'])])
-                item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
-                item.setCheckState(0, QtCore.Qt.Checked if (
-                            select_all_visible or logger_name in current_checked_texts) else QtCore.Qt.Unchecked)
-                items_to_add.append(item)
-        if items_to_add: self.message_types_tree.addTopLevelItems(items_to_add)
-
-        current_sort_col = self.message_types_tree.sortColumn()
-        current_sort_order = self.message_types_tree.header().sortIndicatorOrder()
-        self.message_types_tree.sortItems(current_sort_col if current_sort_col != -1 else 1,
-                                          current_sort_order if current_sort_col != -1 else QtCore.Qt.DescendingOrder)
-        self.message_types_tree.blockSignals(False)
+        with QtBulkUpdate(self.message_types_tree):
+            self.message_types_tree.clear();
+            items_to_add = []
+            for logger_name, data in self.message_types_data_for_list.items():
+                if data['count'] > 0:
+                    item = SortableTreeWidgetItem([logger_name, str(data['count'])])
+                    item.set_sort_key(1, data['count'])
+                    item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
+                    item.setCheckState(0, QtCore.Qt.Checked if (
+                                select_all_visible or logger_name in current_checked_texts) else QtCore.Qt.Unchecked)
+                    items_to_add.append(item)
+            if items_to_add: self.message_types_tree.addTopLevelItems(items_to_add)
+
+            current_sort_col = self.message_types_tree.sortColumn()
+            current_sort_order = self.message_types_tree.header().sortIndicatorOrder()
+            self.message_types_tree.sortItems(current_sort_col if current_sort_col != -1 else 1,
+                                              current_sort_order if current_sort_col != -1 else QtCore.Qt.DescendingOrder)
         self._apply_message_type_filter()
 
     def on_message_type_item_changed(self, item, column):
@@ -693,46 +723,18 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
     def set_check_state_for_all_types(self, check_state):
         if self._is_batch_updating_ui: return
         self._enter_batch_update()
-        self.message_types_tree.blockSignals(True)
-        for i in range(self.message_types_tree.topLevelItemCount()):
-            item = self.message_types_tree.topLevelItem(i)
-            # Operates on all items, regardless of hidden status
-            if item.checkState(0) != check_state:
-                item.setCheckState(0, check_state)
-        self.message_types_tree.blockSignals(False)
-        self._exit_batch_update()
-        self._trigger_timeline_update_from_selection()
-
-    # Changed: Renamed and modified to only act on VISIBLE (non-hidden) types
-    def set_check_state_for_visible_types(self, check_state):
-        if self._is_batch_updating_ui: return
-        self._enter_batch_update()
-        self.message_types_tree.blockSignals(True)
-        for i in range(self.message_types_tree.topLevelItemCount()):
-            item = self.message_types_tree.topLevelItem(i)
-            if not item.isHidden(): # Only operate on non-hidden items
-                if item.checkState(0) != check_state: item.setCheckState(0, check_state)
-        self.message_types_tree.blockSignals(False)
+        with QtBulkUpdate(self.message_types_tree):
+            for i in range(self.message_types_tree.topLevelItemCount()):
+                item = self.message_types_tree.topLevelItem(i)
+                # Operates on all items, regardless of hidden status
+                if item.checkState(0) != check_state:
+                    item.setCheckState(0, check_state)
         self._exit_batch_update()
         self._trigger_timeline_update_from_selection()
 
     def _trigger_timeline_update_from_selection(self):
-        if self._is_batch_updating_ui: return
-        selected_types = set()
-        for i in range(self.message_types_tree.topLevelItemCount()):
-            item = self.message_types_tree.topLevelItem(i)
-            if item.checkState(0) == QtCore.Qt.Checked:
-                 selected_types.add(item.text(0))
-
-        self.timeline_canvas.update_display_config(selected_types, self.granularity_combo.currentText())
-
-    def on_granularity_changed(self):
-        if self._is_batch_updating_ui: return
-        self._enter_batch_update()
-        self.pan_slider.setValue(0);
-        self.zoom_slider.setValue(self.slider_scale_factor)
-        self._exit_batch_update()
-        self._trigger_timeline_update_from_selection()
+        # Checked types come from AppLogic's shadow set, and the update goes through its coalescing timer
+        self.app_logic.trigger_timeline_update_from_selection()
 
     def reset_all_filters_and_view(self, initial_load=False):
         self._enter_batch_update()
@@ -789,11 +791,6 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
     def set_current_temp_dir(self, path):
         self.current_temp_dir = path
 
-    def _cleanup_temp_dir(self):
-        if self.current_temp_dir and os.path.exists(self.current_temp_dir):
-            shutil.rmtree(self.current_temp_dir, ignore_errors=True)
-        self.current_temp_dir = None
-
     def show_filter_dialog(self):
         if self.filter_dialog is None:
             self.filter_dialog = FilterManagementDialog(self)
@@ -805,6 +802,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
             new_dir = self.filter_dialog.get_selected_directory()
             if new_dir:
                 self.last_filter_directory = new_dir
+                self._mark_settings_dirty()
 
     def show_filter_crud_dialog(self):
         print("Opening filter management dialog...")
@@ -831,42 +829,84 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
     def set_current_temp_dir(self, path):
         self.current_temp_dir = path
 
+    def _start_cache_writer(self, log_entries_df, cache_path):
+        """Writes the cache in the background; at most one writer runs at a time."""
+        if self.cache_writer_thread is not None:
+            # Skip rather than block the UI; a later load of this source writes the entry instead
+            print(f"[LogCache] Previous cache write still running, not caching {cache_path}")
+            return
+        # The writer gets its own copy: the UI keeps using and modifying log_entries_full meanwhile
+        writer = LogCacheWriterThread(log_entries_df.copy(), cache_path, self)
+        writer.finished.connect(lambda: self._on_cache_writer_finished(writer))
+        self.cache_writer_thread = writer
+        writer.start()
+
+    def _on_cache_writer_finished(self, writer):
+        if self.cache_writer_thread is writer:
+            self.cache_writer_thread = None
+        writer.deleteLater()
+
+    def _has_temp_dir_sources(self, log_entries_df):
+        """True if any entry was read from a file extracted into the current temp dir."""
+        if not self.current_temp_dir:
+            return False
+        temp_prefix = os.path.join(self.current_temp_dir, '')
+        return any(str(path).startswith(temp_prefix) for path in log_entries_df['source_file_path'].unique())
+
     def _cleanup_temp_dir(self):
-        if self.current_temp_dir and os.path.exists(self.current_temp_dir):
-            shutil.rmtree(self.current_temp_dir, ignore_errors=True)
+        if self.current_temp_dir:
+            shutil.rmtree(self.current_temp_dir, ignore_errors=True) # Also covers an already-removed dir
         self.current_temp_dir = None
 
     def closeEvent(self, event):
         if self.loader_thread and self.loader_thread.isRunning():
             self.loader_thread.stop()
+            self.loader_thread.wait_for_indexer() # A running QThread destroyed at exit aborts the process
             if not self.loader_thread.wait(1500):
                 self.loader_thread.terminate()
+        if self.cache_writer_thread and self.cache_writer_thread.isRunning():
+            self.cache_writer_thread.wait() # Let the cache file be completed
         self._cleanup_temp_dir()  # Clean up on exit
-        self.save_settings()
+        self._save_timer.stop()
+        self.save_settings() # Flush anything still pending
         if self.loading_dialog and self.loading_dialog.isVisible(): self.loading_dialog.reject()
         if self.stats_dialog and self.stats_dialog.isVisible(): self.stats_dialog.close()
         super().closeEvent(event)
 
+    def _mark_settings_dirty(self):
+        """Flags persistable state as changed and schedules a save."""
+        self._settings_dirty = True
+        self.request_save_settings()
+
+    def request_save_settings(self):
+        """Schedules save_settings(); restarting the timer coalesces a burst of changes into one write."""
+        self._save_timer.start()
+
     def save_settings(self):
-        """Saves application state to QSettings."""
+        """Saves application state to QSettings in a single batch and flushes it to disk."""
         self.settings.setValue("geometry", self.saveGeometry())
         self.settings.setValue("windowState", self.saveState())
-        self.settings.setValue("last_log_directory", self.last_log_directory)
-        self.settings.setValue("last_filter_directory", self.last_filter_directory)
-        self.settings.setValue("active_filter_name", self.app_logic.active_filter_name)
-        # QSettings handles lists better than sets
-        self.settings.setValue("active_filter_loggers", list(self.app_logic.active_filter_loggers))
-        self.settings.setValue("recent_files", self.recent_files)
+        if self._settings_dirty:
+            self.settings.setValue("last_log_directory", self.last_log_directory)
+            self.settings.setValue("last_filter_directory", self.last_filter_directory)
+            self.settings.setValue("active_filter_name", self.app_logic.active_filter_name)
+            # QSettings handles lists better than sets
+            self.settings.setValue("active_filter_loggers", list(self.app_logic.active_filter_loggers))
+            self.settings.setValue("recent_files", self.recent_files)
+            self._settings_dirty = False
+        self.settings.sync()
 
     def load_settings(self):
         """Loads application state from QSettings."""
-        if self.settings.value("geometry"):
-            self.restoreGeometry(self.settings.value("geometry"))
-        if self.settings.value("windowState"):
-            self.restoreState(self.settings.value("windowState"))
+        geometry = self.settings.value("geometry")
+        if geometry:
+            self.restoreGeometry(geometry)
+        window_state = self.settings.value("windowState")
+        if window_state:
+            self.restoreState(window_state)
 
-        self.last_log_directory = self.settings.value("last_log_directory", os.path.expanduser("~"))
-        self.last_filter_directory = self.settings.value("last_filter_directory", os.path.expanduser("~"))
+        self.last_log_directory = self.settings.value("last_log_directory", _HOME)
+        self.last_filter_directory = self.settings.value("last_filter_directory", _HOME)
 
         filter_name = self.settings.value("active_filter_name", "None")
         filter_loggers = self.settings.value("active_filter_loggers", [])
@@ -910,6 +950,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
             self.recent_files.remove(path)
         self.recent_files.insert(0, path)
         self.recent_files = self.recent_files[:self.MAX_RECENT_FILES]
+        self._mark_settings_dirty()
         self.update_recent_files_menu()
 
     def update_recent_files_menu(self):
@@ -930,6 +971,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.warning(self, "File Not Found", f"The file {path} could not be found.")
             if path in self.recent_files:
                 self.recent_files.remove(path)
+                self._mark_settings_dirty()
                 self.update_recent_files_menu()
             return
 
@@ -1008,6 +1050,7 @@ class LogAnalyzerApp(QtWidgets.QMainWindow):
 
 
 def main():
+    multiprocessing.freeze_support() # Archive parsing workers re-launch the (possibly frozen) executable
     app = QtWidgets.QApplication(sys.argv)
     app.setApplicationName("iObeya Log Analyzer")
     app.setApplicationVersion("8.0")
@@ -1,22 +1,316 @@
 #!/usr/bin/env python3
+import glob
 import gzip
+import hashlib
 import io
+import mmap
+import multiprocessing
 import os
 import re
 import shutil
 import tempfile
 import zipfile
-from datetime import datetime
 from collections import defaultdict, Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from PyQt5.QtCore import QObject, QThread, pyqtSignal
 from PyQt5 import QtCore # Only QtCore needed for QThread and signals
 import zipfile
 import gzip
 import io
 import os # For path basename
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+import queue
 import tempfile
 import shutil
+from search_engine import SearchEngine
+
+try:
+    import re2 as line_regex # Optional: google-re2 matches in linear time with a DFA
+except ImportError:
+    line_regex = re
+
+# Fixed category order for log_level, so every parsed frame shares one dtype and the codes are stable.
+# Ordered by severity, the order the statistics views list the levels in.
+LOG_LEVEL_DTYPE = pd.CategoricalDtype(['ERROR', 'WARN', 'INFO', 'DEBUG'])
+
+# One match per line: entry lines fill the groups, any other line matches the empty alternative.
+# [^\S\n] is whitespace that cannot run on into the next line. The flag is inline and there are
+# no lookarounds, so the same pattern compiles under both re and re2.
+LINE_PATTERN = line_regex.compile(r'(?m)^(?:(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})[^\S\n]+'
+                                  r'(INFO|WARN|ERROR|DEBUG)[^\S\n]+'
+                                  r'\[(.*?)\](?:[^\S\n]+(.*))?'
+                                  r'|.*)$')
+PARSED_COLUMNS = ['datetime', 'log_level', 'logger_name', 'message_preview']
+ENTRY_COLUMNS = ['datetime', 'datetime_obj', 'log_level', 'logger_name',
+                 'source_file_path', 'line_number', 'message_preview']
+DEFAULT_BYTES_PER_WINDOW = 8 * 1024 * 1024 # Bytes decoded and matched per pass
+
+# Typed, empty schema shared by every "no data" state (startup, empty or failed load, discarded load).
+# Take a shallow copy, so downstream code always sees the loader's dtypes.
+EMPTY_LOG_DF = pd.DataFrame({
+    'datetime': pd.Series([], dtype=object),
+    'datetime_obj': pd.Series([], dtype='datetime64[ns]'),
+    'log_level': pd.Series([], dtype=LOG_LEVEL_DTYPE),
+    'logger_name': pd.Series([], dtype='category'),
+    'source_file_path': pd.Series([], dtype=object),
+    'line_number': pd.Series([], dtype='int64'),
+    'message_preview': pd.Series([], dtype=object),
+})[ENTRY_COLUMNS]
+
+
+def parsed_log_cache_path(source_path, selected_files=None, active_filter_loggers=None):
+    """Returns the Parquet cache file for a log source.
+
+    The key covers the source path, size and modification time, plus the options
+    that change the parsed result (selected archive members and pre-load filter).
+    The file name starts with a hash of the source path alone, so entries written
+    for the same source can be found and evicted (see evict_stale_log_caches).
+    """
+    stat = os.stat(source_path)
+    key_material = (f"{source_path}:{stat.st_size}:{stat.st_mtime}:"
+                    f"{sorted(selected_files or [])}:{sorted(active_filter_loggers or [])}")
+    source_key = hashlib.blake2b(source_path.encode('utf-8'), digest_size=8).hexdigest()
+    key = hashlib.blake2b(key_material.encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f'ioa_cache_{source_key}_{key}.parquet')
+
+
+def evict_stale_log_caches(cache_path):
+    """Removes the other cache entries for the same source as cache_path.
+    Only the latest load of a source is kept; older keys (changed file, other options) would never be read again."""
+    source_prefix = os.path.basename(cache_path).rsplit('_', 1)[0]
+    for stale_path in glob.glob(os.path.join(os.path.dirname(cache_path), f'{source_prefix}_*.parquet')):
+        if stale_path != cache_path:
+            try:
+                os.remove(stale_path)
+            except OSError as e: # In use by another instance, or already gone
+                print(f"[LogCache] Could not remove stale cache {stale_path}: {e}")
+
+
+def concat_log_frames(frames, ignore_index=False):
+    """pd.concat for parsed log frames that keeps log_level and logger_name categorical.
+
+    Frames parsed separately have different categories, for which pd.concat would fall
+    back to object strings; union_categoricals merges the categories and recodes instead.
+    """
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True) if ignore_index else frames[0]
+    categorical_columns = ['log_level', 'logger_name']
+    merged = {column: union_categoricals([frame[column] for frame in frames]) for column in categorical_columns}
+    df = pd.concat([frame.drop(columns=categorical_columns) for frame in frames], ignore_index=ignore_index)
+    for column, values in merged.items():
+        df[column] = values
+    return df[frames[0].columns]
+
+
+def load_cached_log_dataframe(cache_path):
+    """Returns the cached DataFrame, or None if there is no usable cache entry."""
+    if not cache_path or not os.path.exists(cache_path):
+        return None
+    try:
+        df = pd.read_parquet(cache_path)
+    except Exception as e: # No Parquet engine installed, or a corrupt/partial file
+        print(f"[LogCache] Ignoring cache {cache_path}: {e}")
+        return None
+    # Full messages are read on demand from the source files, so they must still be on disk
+    # (extracted archive members live in a temporary directory that is removed between loads).
+    if not all(os.path.exists(path) for path in df['source_file_path'].unique()):
+        return None
+    df['log_level'] = df['log_level'].astype(LOG_LEVEL_DTYPE) # Caches written with another category order
+    return df
+
+
+class LoggerPrefixFilter:
+    """Selects the logger names that start with one of the pre-load filter prefixes.
+
+    Each distinct name is tested once, with a single str.startswith(tuple) call,
+    and the answer is remembered for the rest of the load.
+    """
+    def __init__(self, prefixes):
+        self.prefixes = tuple(prefixes)
+        self._passes = {}
+
+    def __call__(self, logger_names):
+        passes = self._passes
+        for name in logger_names:
+            if name not in passes:
+                passes[name] = name.startswith(self.prefixes)
+        return [name for name in logger_names if passes[name]]
+
+
+def usable_cpu_count():
+    """Number of CPUs this process may run on (respects affinity masks and container limits)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def decompress_gz(gz_path, target_dir):
+    """Decompresses a .gz log next to its siblings in target_dir and returns the new path."""
+    path_to_parse = os.path.join(target_dir, os.path.basename(gz_path)[:-3])
+    with gzip.open(gz_path, 'rb') as f_in, open(path_to_parse, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    return path_to_parse
+
+
+def extract_archive_member(zf, member_name, target_dir):
+    """Streams an archive member into target_dir and returns its path.
+
+    .gz members are decompressed on the way out, so the compressed bytes never land on disk.
+    """
+    base_name = os.path.basename(member_name)
+    is_gz = base_name.endswith('.gz')
+    os.makedirs(target_dir, exist_ok=True)
+    target_path = os.path.join(target_dir, base_name[:-3] if is_gz else base_name)
+    with zf.open(zf.getinfo(member_name)) as source, open(target_path, 'wb') as target:
+        if is_gz:
+            with gzip.GzipFile(fileobj=source) as stream:
+                shutil.copyfileobj(stream, target, 1024 * 1024)
+        else:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+    return target_path
+
+
+def iter_log_windows(path_to_parse, encoding, bytes_per_window=DEFAULT_BYTES_PER_WINDOW):
+    """Yields (first_line_number, window_end, text) for consecutive windows of whole lines.
+
+    The file is memory-mapped and each window is decoded once. Windows end on a newline,
+    which never falls inside a multi-byte character.
+    """
+    file_size = os.path.getsize(path_to_parse)
+    if not file_size:
+        return
+    with open(path_to_parse, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        window_start = 0
+        first_line_number = 1
+        while window_start < file_size:
+            window_end = mm.find(b'\n', min(window_start + bytes_per_window, file_size) - 1)
+            window_end = file_size if window_end == -1 else window_end + 1
+            text = mm[window_start:window_end].decode(encoding)
+            yield first_line_number, window_end, text
+            first_line_number += text.count('\n')
+            window_start = window_end
+
+
+def parse_log_window(text, first_line_number, logger_filter=None):
+    """Parses a window of whole lines into a typed frame of entry metadata, or None if it has no entries.
+
+    A single ``findall`` returns one tuple per line, with empty groups for continuation lines
+    (stack traces, wrapped messages), so a row's position gives its line number.
+    """
+    parsed = pd.DataFrame(LINE_PATTERN.findall(text), columns=PARSED_COLUMNS, dtype=object)
+    parsed.index = pd.RangeIndex(first_line_number, first_line_number + len(parsed))
+    parsed = parsed[parsed['datetime'] != '']
+    if logger_filter is not None:
+        # If filtering is active, keep only loggers starting with one of the filter prefixes
+        parsed = parsed[parsed['logger_name'].isin(logger_filter(parsed['logger_name'].unique()))]
+    if parsed.empty:
+        return None
+    # Typed, column-wise window frame: categorical codes instead of repeated strings, and
+    # one shared string object per distinct timestamp (bursty logs repeat each second many times)
+    datetime_codes, datetime_uniques = pd.factorize(parsed['datetime'])
+    return pd.DataFrame({
+        'datetime': datetime_uniques.take(datetime_codes),
+        'log_level': pd.Categorical(parsed['log_level'], dtype=LOG_LEVEL_DTYPE),
+        'logger_name': pd.Categorical(parsed['logger_name']),
+        'line_number': parsed.index.to_numpy(dtype='int64'), # Start line of the entry
+        'message_preview': parsed['message_preview'].str.strip(), # A small preview
+    })
+
+
+def finish_log_frame(window_frames, path_to_parse, datetime_format):
+    """Combines one file's window frames into its entry DataFrame (ENTRY_COLUMNS)."""
+    if window_frames:
+        df = concat_log_frames(window_frames)
+    else:
+        df = pd.DataFrame(columns=PARSED_COLUMNS + ['line_number'], dtype=object)
+    # Bursty logs repeat the same second many times; cache=True converts each distinct string once
+    df['datetime_obj'] = pd.to_datetime(df['datetime'], format=datetime_format, errors='coerce', cache=True)
+    df['source_file_path'] = path_to_parse # Full path for on-demand loading
+    return df[ENTRY_COLUMNS].reset_index(drop=True)
+
+
+def parse_archive_member(archive_path, member_name, target_dir, datetime_format, filter_prefixes=(), encodings=('utf-8',)):
+    """Extracts one archive member into target_dir and parses it, start to finish, into its entry DataFrame.
+
+    This is the unit of work for the archive process pool, so it only takes and returns
+    picklable values; each worker streams its own member out of the archive.
+    """
+    with zipfile.ZipFile(archive_path) as zf:
+        path_to_parse = extract_archive_member(zf, member_name, target_dir)
+    logger_filter = LoggerPrefixFilter(filter_prefixes) if filter_prefixes else None
+    for encoding in encodings:
+        try:
+            window_frames = []
+            for first_line_number, _, text in iter_log_windows(path_to_parse, encoding):
+                parsed = parse_log_window(text, first_line_number, logger_filter)
+                if parsed is not None:
+                    window_frames.append(parsed)
+            return finish_log_frame(window_frames, path_to_parse, datetime_format)
+        except UnicodeDecodeError:
+            continue
+    raise IOError(f"Could not decode {os.path.basename(path_to_parse)}.")
+
+
+class LogCacheWriterThread(QThread):
+    """Writes a parsed log DataFrame to the Parquet cache without blocking the UI."""
+    def __init__(self, log_entries_df, cache_path, parent=None):
+        super().__init__(parent)
+        self.log_entries_df = log_entries_df
+        self.cache_path = cache_path
+
+    def run(self):
+        partial_path = f"{self.cache_path}.{os.getpid()}.part"
+        try:
+            self.log_entries_df.to_parquet(partial_path, compression='zstd')
+            os.replace(partial_path, self.cache_path) # Readers never see a half-written file
+            evict_stale_log_caches(self.cache_path)
+        except Exception as e: # Parquet support requires pyarrow; caching is best-effort
+            print(f"[LogCache] Could not write cache {self.cache_path}: {e}")
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+
+class SearchIndexerThread(QThread):
+    """Feeds message batches queued by LogLoaderThread into a SearchEngine build,
+    so FTS inserts overlap with reading and parsing instead of following them."""
+    POLL_INTERVAL = 0.1 # Seconds between should_stop checks while the queue is empty
+
+    def __init__(self, search_engine, batch_queue, parent=None):
+        super().__init__(parent)
+        self.search_engine = search_engine
+        self.batch_queue = batch_queue
+        self.failed = False
+        self.should_stop = False
+
+    def run(self):
+        while True:
+            try:
+                item = self.batch_queue.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                if self.should_stop: # Stopped, and the loader has gone quiet (or was terminated)
+                    return
+                continue
+            if item is None: # Sentinel: the loader has queued everything
+                return
+            if self.failed or self.should_stop:
+                continue # Keep draining so the loader never blocks on a full queue
+            try:
+                action, first_row, *messages = item
+                if action == 'add':
+                    self.search_engine.add_batch(messages[0], first_row)
+                else:
+                    self.search_engine.discard_from(first_row)
+            except Exception as e:
+                print(f"[SearchIndexer] Incremental indexing failed: {e}")
+                self.failed = True
+
+    def stop(self):
+        """Skips the batches still queued and ends once the queue is idle, even if no sentinel ever comes."""
+        self.should_stop = True
+
 
 class LogLoaderThread(QThread):
     finished_loading = pyqtSignal(object, object, bool) # df, failed_files_summary, was_cancelled
@@ -30,6 +324,8 @@ class LogLoaderThread(QThread):
     total_progress_update = pyqtSignal(int) # Value for the total progress bar
     message_count_update = pyqtSignal(int, int) # Number of messages loaded so far
 
+    BYTES_PER_WINDOW = DEFAULT_BYTES_PER_WINDOW # Also the cancel/progress granularity of a single file
+
     def __init__(self, file_path=None, archive_path=None, datetime_format=None, 
                  selected_files_from_archive=None, temp_dir=None, active_filter_loggers=None, parent=None, enable_full_text_indexing=False):
         super().__init__(parent)
@@ -39,47 +335,54 @@ class LogLoaderThread(QThread):
         self.selected_files_from_archive = selected_files_from_archive or []
         self.temp_dir = temp_dir
         self.active_filter_loggers = active_filter_loggers or set()
+        self._logger_filter = LoggerPrefixFilter(self.active_filter_loggers) if self.active_filter_loggers else None
         self.total_messages_loaded = 0
         self.should_stop = False
         self.encodings_to_try = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
         self.enable_full_text_indexing = enable_full_text_indexing
+        # Built while parsing when full-text indexing is enabled; handed to the UI with the result
+        self.search_engine = SearchEngine() if enable_full_text_indexing else None
+        self._index_queue = None
+        self._indexer_thread = None
+        self._rows_sent_for_indexing = 0
 
     def run(self):
-        all_log_entries = []
+        all_log_entries = None
+        frames = [] # One DataFrame per parsed file, concatenated once below
+        row_order = None # Parse-order row of each sorted row, to remap the search index
         failed_files_summary = []
         try:
             if not self.temp_dir or not os.path.exists(self.temp_dir):
                 raise Exception("Temporary directory not provided or does not exist.")
 
+            if self.search_engine is not None:
+                self._start_incremental_indexing()
+
             if self.archive_path:
                 self.status_update.emit("Processing archive...", os.path.basename(self.archive_path))
-                all_log_entries, failed_files_summary = self._process_archive()
+                frames, failed_files_summary = self._process_archive()
             elif self.file_path:
                 self.status_update.emit("Processing file...", os.path.basename(self.file_path))
-                all_log_entries = self._process_single_file(self.file_path)
+                entries = self._process_single_file(self.file_path)
+                if entries is not None and not entries.empty:
+                    frames.append(entries)
             else:
                 self.error_occurred.emit("No file or archive path specified.")
                 return
 
+            if frames:
+                all_log_entries = concat_log_frames(frames, ignore_index=True)
+
             if self.should_stop:
                 # If we were stopped, we don't sort, just return what we have.
                 return
 
-            if all_log_entries:
+            if all_log_entries is not None and not all_log_entries.empty:
                 self.status_update.emit("Finalizing...", f"Sorting {len(all_log_entries):,} entries")
-                def sort_key(entry):
-                    dt_obj = entry.get('datetime_obj')
-                    if isinstance(dt_obj, datetime) and dt_obj != datetime.min: return dt_obj
-                    try:
-                        return datetime.strptime(entry.get('datetime', ''), self.datetime_format_for_parsing)
-                    except:
-                        return datetime.max
-                all_log_entries.sort(key=sort_key)
-
-            # Conditionally perform full-text indexing
-            if self.enable_full_text_indexing:
-                self.status_update.emit("Performing full-text indexing...", "")
-                # Implement full-text indexing logic here
+                # Stable sort keeps file/line order for equal timestamps; unparsable dates go last
+                all_log_entries.sort_values('datetime_obj', kind='mergesort', na_position='last', inplace=True)
+                row_order = all_log_entries.index.to_numpy()
+                all_log_entries.reset_index(drop=True, inplace=True)
 
         except Exception as e:
             import traceback
@@ -88,11 +391,54 @@ class LogLoaderThread(QThread):
         finally:
             # This block will run no matter what: success, exception, or return.
             # This ensures the main thread is always notified.
-            df_log_entries = pd.DataFrame(all_log_entries) if all_log_entries else pd.DataFrame()
+            if self._indexer_thread is not None:
+                self.status_update.emit("Finishing full-text index...", "")
+                self._finish_incremental_indexing(row_order)
+            df_log_entries = self._build_dataframe(all_log_entries)
             self.finished_loading.emit(df_log_entries, failed_files_summary, self.should_stop)
 
+    def _start_incremental_indexing(self):
+        self.search_engine.begin_incremental()
+        self._index_queue = queue.Queue(maxsize=8) # Bounds memory if indexing falls behind parsing
+        self._indexer_thread = SearchIndexerThread(self.search_engine, self._index_queue)
+        self._indexer_thread.start()
+
+    def _queue_for_indexing(self, messages):
+        if self._index_queue is not None and not self.should_stop: # A stopped indexer discards batches anyway
+            self._index_queue.put(('add', self._rows_sent_for_indexing, messages))
+            self._rows_sent_for_indexing += len(messages)
+
+    def _discard_indexed_rows_from(self, first_row):
+        """Drops rows queued for a file that is being re-read or has failed."""
+        if self._index_queue is not None and not self.should_stop and first_row < self._rows_sent_for_indexing:
+            self._index_queue.put(('discard', first_row))
+            self._rows_sent_for_indexing = first_row
+
+    def _finish_incremental_indexing(self, row_order):
+        if not self._indexer_thread.should_stop:
+            self._index_queue.put(None)
+        self._indexer_thread.wait() # A stopped indexer ends by itself once the queue is idle
+        if self._indexer_thread.failed or self._indexer_thread.should_stop:
+            self.search_engine.close() # The UI falls back to indexing after load
+            return
+        row_positions = None
+        if row_order is not None:
+            row_positions = np.empty_like(row_order)
+            row_positions[row_order] = np.arange(len(row_order))
+        self.search_engine.finalize(row_positions)
+
+    def _build_dataframe(self, log_entries):
+        """Finalizes the DataFrame here, in the worker thread, with the dtypes the UI relies on:
+        categorical log levels and logger names, and a datetime64 timestamp column."""
+        if log_entries is None or log_entries.empty:
+            return EMPTY_LOG_DF.copy(deep=False)
+        df = log_entries
+        df['log_level'] = df['log_level'].astype(LOG_LEVEL_DTYPE)
+        df['logger_name'] = df['logger_name'].astype('category')
+        return df
+
     def _process_archive(self):
-        all_entries = []
+        frames = []
         failed_files = []
         try:
             with zipfile.ZipFile(self.archive_path, 'r') as zf:
@@ -102,34 +448,112 @@ class LogLoaderThread(QThread):
                 self.total_progress_config.emit(0, total_files)
                 self.total_progress_update.emit(0)
 
-                for i, filename in enumerate(files_to_process):
-                    if self.should_stop: break
-                    self.total_progress_update.emit(i)
-                    self.status_update.emit(f"File {i+1} of {total_files}", filename)
-
+                parse_in_parallel = total_files > 1 and usable_cpu_count() > 1
+                if parse_in_parallel:
+                    # Several independent files: parse them on all cores
+                    first_indexed_row = self._rows_sent_for_indexing
                     try:
-                        member_info = zf.getinfo(filename)
-                        temp_file_path = os.path.join(self.temp_dir, os.path.basename(filename))
-                        with zf.open(member_info) as source, open(temp_file_path, 'wb') as target:
-                            shutil.copyfileobj(source, target)
+                        frames = self._parse_members_in_parallel(zf, files_to_process, failed_files)
+                    except BrokenProcessPool as e:
+                        # Workers could not start (e.g. restricted environment); redo the archive in this thread
+                        print(f"[LogLoader] Parallel parsing unavailable, parsing sequentially: {e}")
+                        self._discard_indexed_rows_from(first_indexed_row)
+                        failed_files.clear()
+                        self.total_messages_loaded = 0
+                        self.total_progress_update.emit(0)
+                        parse_in_parallel = False
 
-                        entries = self._process_single_file(temp_file_path, is_in_archive=True)
-                        all_entries.extend(entries)
-                        self.total_messages_loaded += len(entries)
+                if not parse_in_parallel:
+                    for i, filename in enumerate(files_to_process):
+                        if self.should_stop: break
+                        self.total_progress_update.emit(i)
+                        self.status_update.emit(f"File {i+1} of {total_files}", filename)
 
-                    except KeyError:
-                        failed_files.append((filename, "File not found in archive."))
-                    except Exception as e:
-                        failed_files.append((filename, str(e)))
-                    
-                    if self.should_stop: break
+                        try:
+                            temp_file_path = extract_archive_member(zf, filename, self._member_dir(i))
+                            entries = self._process_single_file(temp_file_path, is_in_archive=True)
+                            if entries is not None and not entries.empty:
+                                frames.append(entries)
+                                self.total_messages_loaded += len(entries)
+
+                        except KeyError:
+                            failed_files.append((filename, "File not found in archive."))
+                        except Exception as e:
+                            failed_files.append((filename, str(e)))
+
+                        if self.should_stop: break
 
                 self.total_progress_update.emit(total_files)
 
         except (zipfile.BadZipFile, FileNotFoundError) as e:
             self.error_occurred.emit(f"Error opening archive: {e}")
             return [], []
-        return all_entries, failed_files
+        return frames, failed_files
+
+    def _member_dir(self, position):
+        """Each archive member gets its own folder under temp_dir, so members that share
+        a base name in different archive folders don't overwrite each other."""
+        return os.path.join(self.temp_dir, f"member_{position}")
+
+    def _parse_members_in_parallel(self, zf, files_to_process, failed_files):
+        """Extracts and parses members in a process pool, each worker streaming its own member.
+
+        Frames are handed on in archive order whatever order the workers finish in, so the
+        row order (and the search index built from it) does not depend on scheduling.
+        """
+        total_files = len(files_to_process)
+        filter_prefixes = self._logger_filter.prefixes if self._logger_filter else ()
+        frames = []
+        results = {} # Archive position -> parsed DataFrame, or None for a failed member
+        next_position = 0
+        self.file_progress_config.emit(0, 0) # Files are parsed concurrently; only the total bar is meaningful
+
+        # 'spawn' rather than fork: forking a process that runs Qt and other threads is unsafe
+        executor = ProcessPoolExecutor(max_workers=min(usable_cpu_count(), total_files),
+                                       mp_context=multiprocessing.get_context('spawn'))
+        try:
+            futures = {}
+            for position, filename in enumerate(files_to_process):
+                if self.should_stop: break
+                try:
+                    zf.getinfo(filename)
+                except KeyError:
+                    failed_files.append((filename, "File not found in archive."))
+                    results[position] = None
+                    continue
+                future = executor.submit(parse_archive_member, zf.filename, filename, self._member_dir(position),
+                                         self.datetime_format_for_parsing, filter_prefixes, self.encodings_to_try)
+                futures[future] = (position, filename)
+
+            pending = set(futures)
+            completed = 0
+            while pending and not self.should_stop:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    position, filename = futures[future]
+                    try:
+                        results[position] = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        failed_files.append((filename, f"Error processing {os.path.basename(filename)}: {e}"))
+                        results[position] = None
+                    completed += 1
+                    self.total_progress_update.emit(completed)
+                    self.status_update.emit(f"Parsed {completed} of {total_files} files", filename)
+
+                while next_position in results:
+                    entries = results.pop(next_position)
+                    next_position += 1
+                    if entries is not None and not entries.empty:
+                        frames.append(entries)
+                        self._queue_for_indexing(entries['message_preview'].tolist())
+                        self.total_messages_loaded += len(entries)
+                        self.message_count_update.emit(len(entries), self.total_messages_loaded)
+        finally:
+            # On cancel, drop queued files and don't wait for the ones still being parsed
+            executor.shutdown(wait=not self.should_stop, cancel_futures=True)
+        return frames
 
     def _process_single_file(self, file_path_to_process, is_in_archive=False):
         if not is_in_archive:
@@ -137,92 +561,64 @@ class LogLoaderThread(QThread):
             self.total_progress_update.emit(0)
 
         path_to_parse = file_path_to_process
+        first_indexed_row = self._rows_sent_for_indexing
         try:
             if file_path_to_process.endswith('.gz'):
                 self.file_progress_config.emit(0, 0) # Indeterminate for decompression
-                uncompressed_filename = os.path.basename(file_path_to_process)[:-3]
-                path_to_parse = os.path.join(self.temp_dir, uncompressed_filename)
-                with gzip.open(file_path_to_process, 'rb') as f_in, open(path_to_parse, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+                path_to_parse = decompress_gz(file_path_to_process, self.temp_dir)
 
             file_size = os.path.getsize(path_to_parse)
             self.file_progress_config.emit(0, file_size)
 
             detected_encoding = 'utf-8' # Default
             try:
-                with open(path_to_parse, 'r', encoding='utf-8') as f:
-                    return self._parse_log_from_iterator(f, path_to_parse, file_size)
+                return self._parse_log_file(path_to_parse, file_size, detected_encoding)
             except UnicodeDecodeError:
+                self._discard_indexed_rows_from(first_indexed_row)
                 self.status_update.emit("Decoding error, trying fallback...", os.path.basename(path_to_parse))
                 for enc in self.encodings_to_try[1:]:
-                    if self.should_stop: return []
+                    if self.should_stop: return None
                     try:
-                        with open(path_to_parse, 'r', encoding=enc) as f:
-                            detected_encoding = enc
-                            return self._parse_log_from_iterator(f, path_to_parse, file_size)
+                        detected_encoding = enc
+                        return self._parse_log_file(path_to_parse, file_size, detected_encoding)
                     except UnicodeDecodeError:
+                        self._discard_indexed_rows_from(first_indexed_row)
                         continue
                 raise IOError(f"Could not decode {os.path.basename(path_to_parse)}.")
 
         except Exception as e:
+            self._discard_indexed_rows_from(first_indexed_row)
             raise Exception(f"Error processing {os.path.basename(file_path_to_process)}: {e}")
         finally:
             if not is_in_archive:
                 self.total_progress_update.emit(1)
 
-    def _parse_log_from_iterator(self, file_iterator, source_name, file_size):
-        entry_pattern = re.compile(
-            r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\s+'
-            r'(INFO|WARN|ERROR|DEBUG)\s+'
-            r'\[(.*?)\]\s+'
-            r'(.*)'
-        )
-        log_entries = []
-        line_number = 0
-        bytes_read = 0
-        is_filtering_active = bool(self.active_filter_loggers)
+    def _parse_log_file(self, path_to_parse, file_size, encoding):
+        """Parses a log file window by window, reporting progress and feeding the search index as it goes."""
+        frames = []
         total_messages = 0
 
-        for line_text in file_iterator:
-            if self.should_stop: break
-            line_number += 1
-            bytes_read += len(line_text.encode('utf-8', errors='ignore'))
-
-            if line_number % 500 == 0:
-                self.file_progress_update.emit(bytes_read)
-
-            match = entry_pattern.match(line_text)
-            if match:
-                # If filtering is active, check if the logger name starts with any of the filter prefixes
-                if is_filtering_active:
-                    logger_name_from_log = match.group(3)
-                    if not any(logger_name_from_log.startswith(prefix) for prefix in self.active_filter_loggers):
-                        continue  # Skip this line as it doesn't match the filter
-                dt_str, lvl, lgr, msg_content = match.groups()
-                parsed_dt = datetime.min
-                try:
-                    parsed_dt = datetime.strptime(dt_str, self.datetime_format_for_parsing)
-                except ValueError:
-                    pass
-
-                # Create a metadata-only entry
-                entry = {
-                    'datetime': dt_str,
-                    'datetime_obj': parsed_dt,
-                    'log_level': lvl,
-                    'logger_name': lgr,
-                    'source_file_path': source_name, # Full path for on-demand loading
-                    'line_number': line_number, # Start line of the entry
-                    'message_preview': msg_content.strip() # A small preview
-                }
-                log_entries.append(entry)
-                total_messages += 1
-                if total_messages % 1000 == 0:
-                    self.message_count_update.emit(total_messages, self.total_messages_loaded + total_messages)
+        for first_line_number, window_end, text in iter_log_windows(path_to_parse, encoding, self.BYTES_PER_WINDOW):
+            if self.should_stop:
+                break
+            parsed = parse_log_window(text, first_line_number, self._logger_filter)
+            if parsed is not None:
+                frames.append(parsed)
+                self._queue_for_indexing(parsed['message_preview'].tolist())
+                total_messages += len(parsed)
+            self.file_progress_update.emit(window_end)
+            self.message_count_update.emit(total_messages, self.total_messages_loaded + total_messages)
 
         self.file_progress_update.emit(file_size) # Final update for this file
         self.message_count_update.emit(total_messages, self.total_messages_loaded + total_messages) # Final count for this file
-        return log_entries
+        return finish_log_frame(frames, path_to_parse, self.datetime_format_for_parsing)
 
     def stop(self):
         self.should_stop = True
+        if self._indexer_thread is not None:
+            self._indexer_thread.stop() # Don't index the queued batches of a load that is being abandoned
+
+    def wait_for_indexer(self):
+        """Blocks until the background indexer has ended; call after stop()."""
+        if self._indexer_thread is not None:
+            self._indexer_thread.wait()
@@ -1,4 +1,7 @@
+import itertools
 import sqlite3
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 from typing import Union, Callable
 
@@ -7,6 +10,15 @@ class SearchEngine:
     def __init__(self):
         self.conn = None
         self.is_indexed = False
+        self.row_positions = None # Maps indexing order to DataFrame row, when the rows were reordered after indexing
+        # Repeated queries (e.g. re-filtering while toggling other filters) skip SQLite. The generation
+        # is part of the key and bumps whenever the index changes, so stale results never leak.
+        self._generation = 0
+        self._search_cached = lru_cache(maxsize=64)(self._search_impl)
+
+    def _invalidate_search_cache(self):
+        self._generation += 1
+        self._search_cached.cache_clear()
 
     def index_data(self, messages: list[str], progress_callback: Union[Callable[[int, int], None], None] = None):
         """
@@ -20,26 +32,70 @@ class SearchEngine:
             self.is_indexed = False
             return
 
-        if self.conn:
-            self.conn.close()
+        self.begin_incremental()
+        total_rows = len(messages)
+        if not progress_callback:
+            # Nothing to report between chunks: stream every row through one executemany
+            self.add_batch(messages)
+            self.finalize()
+            return
 
-        self.conn = sqlite3.connect(':memory:')
+        chunk_size = 50000
+        for i in range(0, total_rows, chunk_size):
+            self.add_batch(messages[i:i + chunk_size], first_row=i)
+            progress_callback(min(i + chunk_size, total_rows), total_rows)
+        self.finalize()
+
+    def begin_incremental(self):
+        """
+        Opens a fresh, empty index and starts the transaction that add_batch() inserts into.
+
+        The connection may be handed between threads (built by a loader, searched by the UI),
+        but only one thread uses it at a time.
+        """
+        self.close()
+        # Autocommit mode: the single transaction is opened here and closed by finalize()
+        self.conn = sqlite3.connect(':memory:', isolation_level=None, detect_types=0, check_same_thread=False)
         cursor = self.conn.cursor()
+        # The index is a throwaway in-memory database, so skip journaling and durability work
+        cursor.executescript('''
+            PRAGMA journal_mode=OFF;
+            PRAGMA synchronous=OFF;
+            PRAGMA locking_mode=EXCLUSIVE;
+            PRAGMA temp_store=MEMORY;
+        ''')
         cursor.execute('CREATE VIRTUAL TABLE logs USING fts5(log_message)')
+        cursor.execute('BEGIN')
 
-        total_rows = len(messages)
-        chunk_size = 10000
+    def add_batch(self, messages: list[str], first_row: int = 0):
+        """
+        Indexes messages as rows first_row, first_row + 1, ... of the ongoing build.
 
-        for i in range(0, total_rows, chunk_size):
-            chunk = messages[i:i + chunk_size]
-            # The data needs to be a list of tuples for executemany
-            data_to_insert = [(msg,) for msg in chunk]
-            cursor.executemany('INSERT INTO logs (log_message) VALUES (?)', data_to_insert)
-            if progress_callback:
-                progress_callback(min(i + chunk_size, total_rows), total_rows)
-        
-        self.conn.commit()
+        Args:
+            messages (list[str]): Log message strings, in row order.
+            first_row (int): 0-based row of the first message.
+        """
+        # FTS rowid is 1-based, rows are 0-based. executemany consumes the pairs lazily,
+        # so no list of parameter tuples is built.
+        self.conn.executemany('INSERT INTO logs (rowid, log_message) VALUES (?, ?)',
+                              zip(itertools.count(first_row + 1), messages))
+
+    def discard_from(self, first_row: int):
+        """Removes rows first_row and onwards from the ongoing build, e.g. to re-read a file."""
+        self.conn.execute('DELETE FROM logs WHERE rowid > ?', (first_row,))
+
+    def finalize(self, row_positions: Union[np.ndarray, None] = None):
+        """
+        Commits the ongoing build and makes the index searchable.
+
+        Args:
+            row_positions (np.ndarray, optional): row_positions[i] is the final DataFrame row of
+                indexed row i, for rows that were sorted after being indexed.
+        """
+        self.conn.execute('COMMIT')
+        self.row_positions = row_positions
         self.is_indexed = True
+        self._invalidate_search_cache()
 
     def search(self, query: str) -> set:
         """
@@ -49,16 +105,19 @@ class SearchEngine:
             query (str): The search query.
 
         Returns:
-            set: A set of 0-based integer indices matching the query. Can be empty.
+            frozenset: 0-based integer indices matching the query. Can be empty. Results are
+                cached and shared between calls, hence immutable.
         """
         if not self.is_indexed or not query:
-            return set()
+            return frozenset()
+        return self._search_cached(self._generation, query)
 
+    def _search_impl(self, generation: int, query: str) -> frozenset:
         # Sanitize and build the query to be more robust.
         # This creates an AND query for all terms, with a prefix match on the last term.
         terms = query.split()
         if not terms:
-            return set()
+            return frozenset()
             
         terms[-1] += '*'
         fts_query = ' '.join(terms)
@@ -68,10 +127,13 @@ class SearchEngine:
             cursor.execute('SELECT rowid FROM logs WHERE logs MATCH ?', (fts_query,))
             results = cursor.fetchall()
             # FTS rowid is 1-based, DataFrame index is 0-based.
-            return {row[0] - 1 for row in results}
+            indexed_rows = [row[0] - 1 for row in results]
+            if self.row_positions is not None:
+                return frozenset(self.row_positions[indexed_rows].tolist())
+            return frozenset(indexed_rows)
         except sqlite3.OperationalError:
             # This can happen with invalid FTS queries (e.g., just '*')
-            return set()
+            return frozenset()
 
     def close(self):
         """Closes the database connection and clears the index."""
@@ -79,3 +141,5 @@ class SearchEngine:
             self.conn.close()
             self.conn = None
             self.is_indexed = False
+            self.row_positions = None
+        self._invalidate_search_cache()
@@ -8,11 +8,32 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import numpy as np
 from matplotlib.ticker import PercentFormatter
+from log_processing import LOG_LEVEL_DTYPE
 
 class StatsDialog(QtWidgets.QDialog):
+    # One colour per LOG_LEVEL_DTYPE category (ERROR, WARN, INFO, DEBUG); the extra last entry is for unknown levels
+    _LEVEL_COLORS = np.array(['#D32F2F', '#F57C00', '#1976D2', '#7B1FA2', '#AAAAAA'])
+
     def __init__(self, all_log_entries, parent=None):
         super().__init__(parent)
+        if not pd.api.types.is_datetime64_dtype(all_log_entries['datetime_obj']):
+            # The min/max and period math below expect a native datetime64 column
+            all_log_entries = all_log_entries.assign(
+                datetime_obj=pd.to_datetime(all_log_entries['datetime_obj'], errors='coerce', utc=False))
         self.all_log_entries = all_log_entries
+        # Counted once here and shared by every tab
+        # logger_name and log_level arrive categorical from the loader, so the counts work on codes
+        logger_counts = all_log_entries['logger_name'].value_counts()
+        self._logger_counts = logger_counts[logger_counts > 0] # Categorical counts include unused categories
+        self._level_counts = all_log_entries['log_level'].value_counts()
+        self._top10 = self._logger_counts.iloc[:10] # value_counts is already sorted by descending count
+        logger_names = all_log_entries['logger_name']
+        if isinstance(logger_names.dtype, pd.CategoricalDtype):
+            # Match the top-10 on integer category codes rather than hashing every row's string
+            top_codes = np.flatnonzero(logger_names.cat.categories.isin(self._top10.index))
+            self._top10_mask = np.isin(logger_names.cat.codes.to_numpy(), top_codes)
+        else:
+            self._top10_mask = logger_names.isin(self._top10.index).to_numpy()
         self.setWindowTitle("Global Log Statistics")
         self.setMinimumSize(900, 700) # Increased size for new chart
         layout = QtWidgets.QVBoxLayout(self)
@@ -24,6 +45,11 @@ class StatsDialog(QtWidgets.QDialog):
         self.create_pareto_tab()
         self.create_level_dist_tab()
         self.create_top_messages_breakdown_tab()
+        # Renderers in tab order; each tab is filled the first time it is shown
+        self._tab_renderers = [self.populate_summary_tab, self.plot_pareto_chart,
+                               self.plot_level_distribution, self.plot_top_messages_breakdown]
+        self._rendered = set()
+        self.tab_widget.currentChanged.connect(self._render_tab)
 
         # Populate with data
         self.populate_tabs()
@@ -31,16 +57,20 @@ class StatsDialog(QtWidgets.QDialog):
     def create_summary_tab(self):
         summary_tab = QtWidgets.QWidget()
         summary_layout = QtWidgets.QVBoxLayout(summary_tab)
-        scroll_area = QtWidgets.QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        summary_layout.addWidget(scroll_area)
+        self._summary_scroll = QtWidgets.QScrollArea()
+        self._summary_scroll.setWidgetResizable(True)
+        summary_layout.addWidget(self._summary_scroll)
+        self._new_summary_container()
+        self.tab_widget.addTab(summary_tab, "Overall Summary")
+
+    def _new_summary_container(self):
+        """Put an empty form in the summary scroll area. setWidget deletes the previous container and all its rows at once."""
         summary_container = QtWidgets.QWidget()
         self.summary_form_layout = QtWidgets.QFormLayout(summary_container)
         self.summary_form_layout.setRowWrapPolicy(QtWidgets.QFormLayout.WrapAllRows)
         self.summary_form_layout.setLabelAlignment(QtCore.Qt.AlignLeft)
         self.summary_form_layout.setFormAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop)
-        scroll_area.setWidget(summary_container)
-        self.tab_widget.addTab(summary_tab, "Overall Summary")
+        self._summary_scroll.setWidget(summary_container)
 
     def create_pareto_tab(self):
         pareto_tab = QtWidgets.QWidget()
@@ -64,27 +94,27 @@ class StatsDialog(QtWidgets.QDialog):
         self.tab_widget.addTab(tab, "Top 10 Breakdown")
 
     def populate_tabs(self):
-        self.populate_summary_tab()
-        self.plot_pareto_chart()
-        self.plot_level_distribution()
-        self.plot_top_messages_breakdown()
+        self._rendered.clear()
+        self._render_tab(self.tab_widget.currentIndex())
+
+    def _render_tab(self, index):
+        if index < 0 or index in self._rendered: return
+        self._rendered.add(index)
+        self._tab_renderers[index]()
 
     def populate_summary_tab(self):
-        # Clear previous widgets
-        while self.summary_form_layout.count():
-            item = self.summary_form_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+        # Start from a fresh form instead of removing the previous rows one by one
+        self._new_summary_container()
 
         if self.all_log_entries.empty:
             self.summary_form_layout.addRow(QtWidgets.QLabel("No log entries loaded."))
             return
 
         total_entries = len(self.all_log_entries)
-        first_dt = self.all_log_entries['datetime_obj'].min()
-        last_dt = self.all_log_entries['datetime_obj'].max()
-        logger_counts = self.all_log_entries['logger_name'].value_counts()
-        level_counts = self.all_log_entries['log_level'].value_counts()
+        datetimes = self.all_log_entries['datetime_obj'].to_numpy()
+        datetimes = datetimes[~np.isnat(datetimes)] # numpy min/max would propagate NaT
+        logger_counts = self._logger_counts
+        level_counts = self._level_counts
 
         # Helper to add a section
         def add_section(title):
@@ -95,34 +125,38 @@ class StatsDialog(QtWidgets.QDialog):
         # General Stats
         add_section("Global Statistics")
         period = "N/A"
-        if pd.notna(first_dt) and pd.notna(last_dt):
-            period = f"{first_dt:%Y-%m-%d %H:%M:%S} to {last_dt:%Y-%m-%d %H:%M:%S} (Duration: {str(last_dt - first_dt).split('.')[0]})"
+        if datetimes.size:
+            first_dt, last_dt = datetimes.min(), datetimes.max()
+            first_str, last_str = np.datetime_as_string(np.array([first_dt, last_dt]), unit='s')
+            days, seconds = divmod(int((last_dt - first_dt).astype('timedelta64[s]').astype(np.int64)), 86400)
+            duration = f"{days} days {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+            period = f"{first_str.replace('T', ' ')} to {last_str.replace('T', ' ')} (Duration: {duration})"
         self.summary_form_layout.addRow("Time Period:", QtWidgets.QLabel(period))
         self.summary_form_layout.addRow("Total Entries:", QtWidgets.QLabel(f"{total_entries:,}"))
         self.summary_form_layout.addRow("Unique Message Types:", QtWidgets.QLabel(f"{len(logger_counts):,}"))
 
         # Log Levels
         add_section("Entries by Log Level")
-        for level in ['ERROR', 'WARN', 'INFO', 'DEBUG']:
-            count = level_counts.get(level, 0)
-            percent = (count / total_entries * 100) if total_entries > 0 else 0
+        counts = level_counts.reindex(LOG_LEVEL_DTYPE.categories, fill_value=0).to_numpy(dtype=np.int64)
+        percents = counts * (100.0 / total_entries)
+        for level, count, percent in zip(LOG_LEVEL_DTYPE.categories, counts, percents):
             self.summary_form_layout.addRow(f"{level}:", QtWidgets.QLabel(f"{count:>10,} ({percent:.2f}%)"))
 
         # Top 10 Messages
         add_section("Top 10 Most Frequent Message Types")
-        for logger, count in logger_counts.nlargest(10).items():
+        for logger, count in self._top10.items():
             self.summary_form_layout.addRow(f"{logger}:", QtWidgets.QLabel(f"{count:,}"))
 
     def plot_pareto_chart(self):
         if self.all_log_entries.empty: return
-        logger_counts = self.all_log_entries['logger_name'].value_counts()
+        logger_counts = self._logger_counts
         if logger_counts.empty: return
 
-        top_20_counts = logger_counts.nlargest(20)
-        loggers = top_20_counts.index.tolist()
-        counts = top_20_counts.values
+        top_20_counts = logger_counts.iloc[:20]
+        loggers = top_20_counts.index.to_numpy()
+        counts = top_20_counts.to_numpy()
         
-        cum_percent = np.cumsum(counts) / len(self.all_log_entries) * 100
+        cum_percent = counts.cumsum() * (100.0 / self.all_log_entries.shape[0])
 
         fig = self.pareto_canvas.figure
         fig.clear()
@@ -144,52 +178,51 @@ class StatsDialog(QtWidgets.QDialog):
 
         fig.suptitle(f"Pareto Chart of Message Types (Top {len(top_20_counts)})", fontsize=12)
         fig.tight_layout(rect=[0, 0.05, 1, 0.95])
-        self.pareto_canvas.draw()
+        self.pareto_canvas.draw_idle()
+
+    def _level_colors(self, levels):
+        """Colours for a sequence of level names, looked up by category code in one indexing step."""
+        return self._LEVEL_COLORS[pd.Categorical(levels, dtype=LOG_LEVEL_DTYPE).codes]
 
     def plot_level_distribution(self):
         if self.all_log_entries.empty: return
-        level_counts = self.all_log_entries['log_level'].value_counts()
+        level_counts = self._level_counts
         if level_counts.empty: return
 
-        ordered_labels = ['ERROR', 'WARN', 'INFO', 'DEBUG']
-        plot_data = level_counts.reindex(ordered_labels).dropna()
+        plot_data = level_counts.reindex(LOG_LEVEL_DTYPE.categories).dropna()
+        plot_data = plot_data[plot_data > 0] # Categorical counts include levels absent from the log
 
         fig = self.level_dist_canvas.figure
         fig.clear()
         ax = fig.add_subplot(111)
-        colors_map = {'ERROR': '#D32F2F', 'WARN': '#F57C00', 'INFO': '#1976D2', 'DEBUG': '#7B1FA2'}
-        pie_colors = [colors_map.get(label, '#AAAAAA') for label in plot_data.index]
+        pie_colors = self._level_colors(plot_data.index)
 
         ax.pie(plot_data.values, labels=plot_data.index, autopct='%1.1f%%', startangle=90, colors=pie_colors, wedgeprops={'edgecolor': 'white'})
         ax.axis('equal')
         fig.suptitle("Log Level Distribution", fontsize=12)
         fig.tight_layout()
-        self.level_dist_canvas.draw()
+        self.level_dist_canvas.draw_idle()
 
     def plot_top_messages_breakdown(self):
         if self.all_log_entries.empty: return
-        logger_counts = self.all_log_entries['logger_name'].value_counts()
-        if logger_counts.empty: return
+        if self._logger_counts.empty: return
 
-        top_10_loggers = logger_counts.nlargest(10).index
-        df_top_10 = self.all_log_entries[self.all_log_entries['logger_name'].isin(top_10_loggers)]
+        top_10_loggers = self._top10.index
+        df_top_10 = self.all_log_entries[self._top10_mask]
 
-        # Pivot table to get counts of each level for each top logger
-        pivot = pd.crosstab(df_top_10['logger_name'], df_top_10['log_level'])
+        # Counts of each level for each top logger, in one grouping pass over the category codes
+        pivot = (df_top_10.groupby(['logger_name', 'log_level'], observed=True).size()
+                 .unstack('log_level', fill_value=0))
         
         # Order columns and logger names
-        ordered_levels = ['ERROR', 'WARN', 'INFO', 'DEBUG']
-        pivot = pivot.reindex(columns=ordered_levels, fill_value=0)
-        pivot = pivot.reindex(index=top_10_loggers)
+        pivot = pivot.reindex(index=top_10_loggers, columns=LOG_LEVEL_DTYPE.categories, fill_value=0)
 
         fig = self.top_messages_canvas.figure
         fig.clear()
         ax = fig.add_subplot(111)
         
-        colors_map = {'ERROR': '#D32F2F', 'WARN': '#F57C00', 'INFO': '#1976D2', 'DEBUG': '#7B1FA2'}
-        
         # Plot stacked bar chart
-        pivot.plot(kind='bar', stacked=True, ax=ax, color=[colors_map.get(c) for c in pivot.columns])
+        pivot.plot(kind='bar', stacked=True, ax=ax, color=self._level_colors(pivot.columns).tolist())
 
         ax.set_title('Log Level Breakdown for Top 10 Message Types', fontsize=12)
         ax.set_xlabel('Message Type (Logger)')
@@ -198,4 +231,4 @@ class StatsDialog(QtWidgets.QDialog):
         ax.legend(title='Log Level')
         
         fig.tight_layout(rect=[0, 0.05, 1, 0.95])
-        self.top_messages_canvas.draw()
\ No newline at end of file
+        self.top_messages_canvas.draw_idle()
\ No newline at end of file
@@ -3,6 +3,7 @@ import sys
 import re
 import threading
 import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from collections import defaultdict, Counter
 from PyQt5 import QtWidgets, QtGui, QtCore
@@ -16,6 +17,52 @@ import os # For path basename (though not directly used here, good to keep if fu
 import pandas as pd
 import locale
 
+_NS_PER_MINUTE = 60 * 1_000_000_000
+_NS_PER_HOUR = 60 * _NS_PER_MINUTE
+_NS_PER_DAY = 24 * _NS_PER_HOUR
+_EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday (Monday == 0)
+
+
+@dataclass
+class LogDataHandle:
+    """The columns the timeline needs, extracted once per load as plain NumPy arrays.
+
+    Rows without a valid timestamp are dropped. Level and logger values are stored as
+    categorical codes into level_cats / logger_cats.
+    """
+    # Declared by hand: dataclass(slots=True) needs Python 3.10 and the README supports older versions
+    __slots__ = ('ts_ns', 'level_codes', 'logger_codes', 'level_cats', 'logger_cats')
+
+    ts_ns: np.ndarray
+    level_codes: np.ndarray
+    logger_codes: np.ndarray
+    level_cats: pd.Index
+    logger_cats: pd.Index
+
+    @classmethod
+    def from_dataframe(cls, df):
+        if df is None or df.empty:
+            return cls.empty_handle()
+        timestamps = df['datetime_obj'].to_numpy()
+        valid = ~np.isnat(timestamps)
+        levels = df['log_level'].astype('category')
+        loggers = df['logger_name'].astype('category')
+        return cls(ts_ns=timestamps[valid].astype('datetime64[ns]').view('int64'),
+                   level_codes=levels.cat.codes.to_numpy()[valid],
+                   logger_codes=loggers.cat.codes.to_numpy()[valid],
+                   level_cats=levels.cat.categories,
+                   logger_cats=loggers.cat.categories)
+
+    @classmethod
+    def empty_handle(cls):
+        no_codes = np.empty(0, dtype=np.int8)
+        return cls(ts_ns=np.empty(0, dtype=np.int64), level_codes=no_codes, logger_codes=no_codes,
+                   level_cats=pd.Index([]), logger_cats=pd.Index([]))
+
+    @property
+    def empty(self):
+        return self.ts_ns.size == 0
+
 
 class TimelineCanvas(FigureCanvas):
     bar_clicked = QtCore.pyqtSignal(datetime, datetime)
@@ -26,7 +73,7 @@ class TimelineCanvas(FigureCanvas):
         super().__init__(self.figure)
         self.setParent(parent)
         self.ax = self.figure.add_subplot(111)
-        self.log_data_cache = pd.DataFrame()
+        self.log_data_cache = LogDataHandle.empty_handle()
         self.time_groups_cache = None
         self.current_selected_message_types = set()
         self.current_time_granularity = 'minute'  # Default
@@ -45,8 +92,8 @@ class TimelineCanvas(FigureCanvas):
         self.mpl_connect('motion_notify_event', self.on_hover)
         self.mpl_connect('axes_leave_event', self.on_leave_axes)
 
-    def set_full_log_data(self, log_entries):
-        self.log_data_cache = log_entries
+    def set_full_log_data(self, log_data_handle):
+        self.log_data_cache = log_data_handle
         self.time_groups_cache = None
 
     def update_display_config(self, selected_message_types, time_granularity):
@@ -66,46 +113,46 @@ class TimelineCanvas(FigureCanvas):
             self.time_groups_cache = {}
             return self.time_groups_cache
 
-        # Filter entries based on selected message types
-        filtered_df = self.log_data_cache[self.log_data_cache['logger_name'].isin(self.current_selected_message_types)]
+        # Filter entries based on selected message types (integer code lookup)
+        data = self.log_data_cache
+        selected_codes = np.flatnonzero(data.logger_cats.isin(list(self.current_selected_message_types)))
+        mask = np.isin(data.logger_codes, selected_codes)
 
-        if filtered_df.empty:
+        if not mask.any():
             self.time_groups_cache = {}
             return self.time_groups_cache
 
-        # Use a copy to avoid SettingWithCopyWarning
-        df = filtered_df.copy()
-        df.dropna(subset=['datetime_obj'], inplace=True)
+        logger_codes = data.logger_codes[mask]
+        rounded_ns = self._floor_to_granularity(data.ts_ns[mask])
 
-        if df.empty:
-            self.time_groups_cache = {}
-            return self.time_groups_cache
+        # Count occurrences per (time bucket, logger) pair
+        bucket_starts, bucket_index = np.unique(rounded_ns, return_inverse=True)
+        num_loggers = len(data.logger_cats)
+        pair_keys, counts = np.unique(bucket_index.astype(np.int64) * num_loggers + logger_codes, return_counts=True)
 
-        # Round the datetimes based on granularity
-        dts = df['datetime_obj']
-        if self.current_time_granularity == 'week':
-            # Manually round to the beginning of the week (Monday) to avoid non-fixed frequency error
-            rounded_time_series = dts.dt.normalize() - pd.to_timedelta(dts.dt.weekday, unit='d')
-        elif self.current_time_granularity == 'day':
-            rounded_time_series = dts.dt.floor('D')
-        elif self.current_time_granularity == 'hour':
-            rounded_time_series = dts.dt.floor('h')
-        else:  # 'minute'
-            rounded_time_series = dts.dt.floor('T')
-        
-        # Group by the rounded time and logger name, then count occurrences
-        grouped = df.groupby([rounded_time_series, 'logger_name']).size().unstack(fill_value=0)
-        
         # Convert to the nested defaultdict structure expected by the rest of the code
+        bucket_times = pd.to_datetime(bucket_starts).to_pydatetime()
+        logger_names = data.logger_cats
         time_groups = defaultdict(lambda: defaultdict(int))
-        for timestamp, row in grouped.iterrows():
-            for logger_name, count in row.items():
-                if count > 0:
-                    time_groups[timestamp.to_pydatetime()][logger_name] = count
+        for bucket, code, count in zip(pair_keys // num_loggers, pair_keys % num_loggers, counts):
+            time_groups[bucket_times[bucket]][logger_names[code]] = int(count)
         
         self.time_groups_cache = time_groups
         return self.time_groups_cache
 
+    def _floor_to_granularity(self, ts_ns):
+        if self.current_time_granularity == 'week':
+            # Round down to the beginning of the week (Monday)
+            days = ts_ns // _NS_PER_DAY
+            return (days - (days + _EPOCH_WEEKDAY) % 7) * _NS_PER_DAY
+        if self.current_time_granularity == 'day':
+            step = _NS_PER_DAY
+        elif self.current_time_granularity == 'hour':
+            step = _NS_PER_HOUR
+        else:  # 'minute'
+            step = _NS_PER_MINUTE
+        return ts_ns - ts_ns % step
+
     def plot_timeline(self, xlim_override=None):
         if xlim_override is not None:
             self.pending_xlim_override = xlim_override
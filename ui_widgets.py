@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
 from PyQt5 import QtWidgets, QtGui, QtCore
-from datetime import datetime # For VirtualTreeWidget sorting
+import numpy as np
+import pandas as pd
 
 class SortableTreeWidgetItem(QtWidgets.QTreeWidgetItem):
+    SORT_KEY_ROLE = QtCore.Qt.UserRole + 1  # Numeric value of a cell, stored when the item is populated
+
+    def set_sort_key(self, column, value):
+        self.setData(column, self.SORT_KEY_ROLE, float(value))
+
     def __lt__(self, other):
         tree_widget = self.treeWidget()
         if not tree_widget:
             return self.text(0).lower() < other.text(0).lower()
         column = tree_widget.sortColumn()
+        key1 = self.data(column, self.SORT_KEY_ROLE)
+        key2 = other.data(column, self.SORT_KEY_ROLE)
+        if key1 is not None and key2 is not None:
+            return key1 < key2  # No string parsing per comparison
         try:
             if column == 1:  # Count column
                 return int(self.text(column)) < int(other.text(column))
@@ -23,6 +33,25 @@ class SortableTreeWidgetItem(QtWidgets.QTreeWidgetItem):
             return self.text(column).lower() < other.text(column).lower()
 
 
+class QtBulkUpdate:
+    """Context manager suspending repaints and signals of a view for the duration of a bulk change."""
+    def __init__(self, widget):
+        self.widget = widget
+
+    def __enter__(self):
+        self._prev_updates_enabled = self.widget.updatesEnabled()
+        self.widget.setUpdatesEnabled(False)
+        self._prev_signals_blocked = self.widget.blockSignals(True)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.widget.blockSignals(self._prev_signals_blocked)
+        self.widget.setUpdatesEnabled(self._prev_updates_enabled)
+        if self._prev_updates_enabled:
+            self.widget.viewport().update()  # Single repaint for the whole batch
+        return False
+
+
 class LoadingDialog(QtWidgets.QDialog):
     cancelled = QtCore.pyqtSignal()
 
@@ -120,137 +149,192 @@ class LoadingDialog(QtWidgets.QDialog):
             self.set_detail(detail_text)
 
 
-class VirtualTreeWidget(QtWidgets.QTreeWidget):
+class LogEntriesModel(QtCore.QAbstractTableModel):
+    """Table model over the filtered, sorted log entries. Views only ask for the rows they paint,
+    so no per-row item objects are created whatever the number of entries."""
+    COLUMN_FIELDS = ('datetime', 'log_level', 'logger_name', 'message_preview')
+    _ERROR_BRUSH = QtGui.QBrush(QtGui.QColor("red"))
+    _WARN_BRUSH = QtGui.QBrush(QtGui.QColor("orange"))
+    LEVEL_BRUSHES = {'ERROR': _ERROR_BRUSH, 'WARN': _WARN_BRUSH}  # Shared by every painted cell
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.header_labels = []
         self.all_items_data = []  # List of dicts
-        self.filtered_items_data = []  # List of dicts (subset of all_items_data)
-        self.visible_items = []  # List of QTreeWidgetItem currently in the tree
-        self.items_per_page = 1000  # How many items to load at once
-        self.current_page = 0
+        self.filtered_indices = np.empty(0, dtype=np.intp)  # Positions in all_items_data that pass the filter, in display order
+        self._search_keys = pd.Series([], dtype=object)  # Lowercased "preview \x1f logger" per row
+        self._sort_keys = {}  # Column -> integer sort key per row, see _sort_key()
+        self._logger_codes = None  # Integer code per row, equal for equal logger names
         self.search_filter = ""
         self.current_sort_column = -1  # No sort initially
         self.current_sort_order = QtCore.Qt.AscendingOrder
 
-        self.verticalScrollBar().valueChanged.connect(self._on_scroll)
-        self.header().sortIndicatorChanged.connect(self.on_sort_indicator_changed)
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.filtered_indices)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMN_FIELDS)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.all_items_data[self.filtered_indices[index.row()]]
+        if role == QtCore.Qt.DisplayRole:
+            return str(entry.get(self.COLUMN_FIELDS[index.column()], ''))
+        if role == QtCore.Qt.ForegroundRole:  # Colorization based on log level (parsed levels are upper case)
+            return self.LEVEL_BRUSHES.get(entry.get('log_level'))
+        if role == QtCore.Qt.UserRole:  # Full entry data
+            return entry
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole and section < len(self.header_labels):
+            return self.header_labels[section]
+        return None
+
+    def set_header_labels(self, labels):
+        self.header_labels = list(labels)
+        self.headerDataChanged.emit(QtCore.Qt.Horizontal, 0, len(self.COLUMN_FIELDS) - 1)
+
+    def entry(self, row):
+        return self.all_items_data[self.filtered_indices[row]]
 
     def set_all_items_data(self, items_data):
         self.all_items_data = items_data
+        # Lowercased once per load instead of on every keystroke; \x1f keeps a match from spanning both fields
+        previews = pd.Series([item_data.get('message_preview', '') for item_data in items_data], dtype=object)
+        loggers = pd.Series([item_data.get('logger_name', '') for item_data in items_data], dtype=object)
+        self._search_keys = (previews.astype(str) + '\x1f' + loggers.astype(str)).str.lower()
+        self._sort_keys = {}
+        self._logger_codes = None
         self.apply_search_filter(self.search_filter, force_refresh=True)  # Re-apply current filter or show all
 
+    def _sort_key(self, col_idx):
+        """Integer sort key per row of all_items_data for a column, built on first use per data set.
+
+        Values are factorized with sort=True, so comparing codes orders rows like comparing the
+        values. Text columns compare case-insensitively; rows without a valid time sort last.
+        """
+        key = self._sort_keys.get(col_idx)
+        if key is not None:
+            return key
+        items_data = self.all_items_data
+        if col_idx == 0:  # Time column
+            values = pd.to_datetime(pd.Series([item_data.get('datetime_obj') for item_data in items_data], dtype=object),
+                                    errors='coerce')
+        else:
+            field = {1: 'log_level', 2: 'logger_name', 3: 'message_preview'}.get(col_idx)  # Message sorts by preview
+            if field is None:  # Fallback for any other unexpected column index, though unlikely with fixed headers
+                field = self.header_labels[col_idx] if col_idx < len(self.header_labels) else None
+            values = pd.Series([item_data.get(field, '') for item_data in items_data], dtype=object).astype(str).str.lower()
+        key, _ = pd.factorize(values, sort=True)
+        key[key < 0] = len(items_data)  # Missing values after every real one
+        self._sort_keys[col_idx] = key
+        return key
+
     def _sort_filtered_data(self):
-        if not self.filtered_items_data or self.current_sort_column == -1:
+        if not len(self.filtered_indices) or self.current_sort_column == -1:
             return
 
-        col_idx = self.current_sort_column
-        reverse_sort = (self.current_sort_order == QtCore.Qt.DescendingOrder)
-
-        # Define how to get a sortable value from the item data dictionary
-        def get_value_for_sort(item_data_dict):
-            if col_idx == 0:  # Time column
-                # Prefer datetime_obj for sorting if available and valid
-                dt_obj = item_data_dict.get('datetime_obj')
-                if isinstance(dt_obj, datetime) and dt_obj != datetime.min:
-                    return dt_obj
-                return item_data_dict.get('datetime', "")  # Fallback to string
-            elif col_idx == 1:  # Level column
-                return item_data_dict.get('log_level', "").lower()
-            elif col_idx == 2:  # Logger column
-                return item_data_dict.get('logger_name', "").lower()
-            elif col_idx == 3:  # Message column (sort by preview)
-                # The message_preview is already a single line.
-                return item_data_dict.get('message_preview', "").lower()
-            # Fallback for any other unexpected column index, though unlikely with fixed headers
-            try:
-                return item_data_dict.get(self.headerItem().text(col_idx), "").lower()
-            except AttributeError:  # headerItem might not be set
-                return ""
-
-        try:
-            self.filtered_items_data.sort(key=get_value_for_sort, reverse=reverse_sort)
-        except TypeError:  # Fallback for mixed types (e.g. datetime vs string if obj is bad)
-            self.filtered_items_data.sort(key=lambda x: str(get_value_for_sort(x)).lower(), reverse=reverse_sort)
+        key = self._sort_key(self.current_sort_column)[self.filtered_indices]
+        if self.current_sort_order == QtCore.Qt.DescendingOrder:
+            key = -key  # Negating keeps equal rows in their current order, like a stable reverse sort
+        self.filtered_indices = self.filtered_indices[np.argsort(key, kind='stable')]
 
-    def on_sort_indicator_changed(self, logical_index, order):
-        self.current_sort_column = logical_index
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        self.beginResetModel()
+        self.current_sort_column = column
         self.current_sort_order = order
         self._sort_filtered_data()
-        self.current_page = 0  # Reset to first page
-        self._refresh_visible_items()
+        self.endResetModel()
 
     def apply_search_filter(self, search_text, force_refresh=False):
         new_search_filter = search_text.lower()
-        # Avoid re-filtering if text hasn't changed and data isn't forced,
-        # unless previous filter resulted in self.filtered_items_data being a new list (not a slice)
-        if not force_refresh and self.search_filter == new_search_filter and \
-                self.filtered_items_data is not self.all_items_data:  # Check if it was actually filtered
+        # Avoid re-filtering if the text hasn't changed and the data isn't new
+        if not force_refresh and self.search_filter == new_search_filter:
             return
 
+        self.beginResetModel()
         self.search_filter = new_search_filter
         if not self.search_filter:
-            self.filtered_items_data = self.all_items_data[:]  # Use a slice to ensure it's a mutable copy if needed
+            self.filtered_indices = np.arange(len(self.all_items_data), dtype=np.intp)
         else:
-            self.filtered_items_data = [
-                item for item in self.all_items_data
-                if self.search_filter in item.get('message_preview', '').lower() or \
-                   self.search_filter in item.get('logger_name', '').lower()
-            ]
+            # Vectorized substring test over all rows at once
+            matches = self._search_keys.str.contains(self.search_filter, regex=False).to_numpy(dtype=bool)
+            self.filtered_indices = np.flatnonzero(matches)
         self._sort_filtered_data()  # Re-sort after filtering
-        self.current_page = 0  # Reset to first page
-        self._refresh_visible_items()
-
-    def _refresh_visible_items(self):
-        self.clear()  # Remove all existing QTreeWidgetItems
-        self.visible_items = []
-        self.current_page = 0  # Reset pagination
-        self._load_more_items()
-
-    def _load_more_items(self):
-        start_idx = self.current_page * self.items_per_page
-        if start_idx >= len(self.filtered_items_data):
-            return  # No more items to load
-
-        end_idx = min(start_idx + self.items_per_page, len(self.filtered_items_data))
-        new_q_items = []
-        for i in range(start_idx, end_idx):
-            entry = self.filtered_items_data[i]
-            # Create QTreeWidgetItem with display data
-            item = QtWidgets.QTreeWidgetItem([ # Using standard QTreeWidgetItem here, Sortable is for the other tree
-                entry['datetime'],
-                entry['log_level'],
-                entry['logger_name'],
-                entry['message_preview']  # Use the pre-generated preview
-            ])
-
-            # --- Colorization based on log level ---
-            log_level = entry.get('log_level', '').upper()
-            color = None
-            if log_level == 'ERROR':
-                color = QtGui.QColor("red")
-            elif log_level == 'WARN':
-                color = QtGui.QColor("orange")
-
-            if color:
-                brush = QtGui.QBrush(color)
-                for col in range(item.columnCount()):
-                    item.setForeground(col, brush)
-            # --- End Colorization ---
-
-            item.setData(0, QtCore.Qt.UserRole, entry)  # Store full entry data
-            new_q_items.append(item)
-
-        if new_q_items:
-            self.addTopLevelItems(new_q_items)
-            self.visible_items.extend(new_q_items)
-            self.current_page += 1
-
-    def _on_scroll(self, value):
-        scrollbar = self.verticalScrollBar()
-        # Load more if near the bottom and more data is available
-        if (scrollbar.maximum() > 0 and value >= scrollbar.maximum() * 0.8 and
-                len(self.visible_items) < len(self.filtered_items_data)):
-            self._load_more_items()
+        self.endResetModel()
+
+    def find_row_with_same_logger(self, row, direction):
+        """Returns the nearest row before (direction < 0) or after row with the same logger, or -1."""
+        if self._logger_codes is None:
+            self._logger_codes, _ = pd.factorize(pd.Series([item_data.get('logger_name') for item_data in self.all_items_data], dtype=object))
+        codes = self._logger_codes[self.filtered_indices]
+        if direction < 0:
+            hits = np.flatnonzero(codes[:row] == codes[row])
+            return int(hits[-1]) if len(hits) else -1
+        hits = np.flatnonzero(codes[row + 1:] == codes[row])
+        return row + 1 + int(hits[0]) if len(hits) else -1
+
+
+class VirtualTreeWidget(QtWidgets.QTreeView):
+    """Flat view of the log entries in a LogEntriesModel, with row-based helpers for the app logic."""
+    itemSelectionChanged = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setModel(LogEntriesModel(self))
+        self.setRootIsDecorated(False)
+        self.setUniformRowHeights(True)  # Single-line rows: Qt can skip per-row height calculation
+        self.selectionModel().selectionChanged.connect(self.itemSelectionChanged)
+        self.header().sortIndicatorChanged.connect(self.on_sort_indicator_changed)
+
+        # Coalesce rapid header clicks into one sort of the full list
+        self._pending_sort = (-1, QtCore.Qt.AscendingOrder)
+        self._sort_timer = QtCore.QTimer(self)
+        self._sort_timer.setSingleShot(True)
+        self._sort_timer.setInterval(50)
+        self._sort_timer.timeout.connect(self._do_sort_and_refresh)
+
+    @property
+    def filtered_indices(self):
+        return self.model().filtered_indices
+
+    def setHeaderLabels(self, labels):
+        self.model().set_header_labels(labels)
+
+    def set_all_items_data(self, items_data):
+        self.model().set_all_items_data(items_data)
+
+    def apply_search_filter(self, search_text, force_refresh=False):
+        self.model().apply_search_filter(search_text, force_refresh)
+
+    def on_sort_indicator_changed(self, logical_index, order):
+        self._pending_sort = (logical_index, order)
+        self._sort_timer.start()  # Restarts the debounce if a sort is already pending
+
+    def _do_sort_and_refresh(self):
+        self.model().sort(*self._pending_sort)
+
+    def row_count(self):
+        return self.model().rowCount()
+
+    def current_row(self):
+        """Row of the selected entry, or -1."""
+        rows = self.selectionModel().selectedRows()
+        return rows[0].row() if rows else -1
+
+    def selected_entry(self):
+        row = self.current_row()
+        return self.model().entry(row) if row >= 0 else None
+
+    def select_row(self, row):
+        index = self.model().index(row, 0)
+        self.setCurrentIndex(index)
+        self.scrollTo(index, QtWidgets.QAbstractItemView.PositionAtCenter)
+
+    def find_row_with_same_logger(self, row, direction):
+        return self.model().find_row_with_same_logger(row, direction)
 
 
 class SearchWidget(QtWidgets.QWidget):
@@ -274,9 +358,14 @@ class SearchWidget(QtWidgets.QWidget):
         self.search_timer = QtCore.QTimer();
         self.search_timer.setSingleShot(True)
         self.search_timer.timeout.connect(self._emit_search_changed)
+        self._last_emitted = ""  # Text of the last search_changed, to skip edits that end where they started
 
     def _on_text_changed_debounced(self, text): self.search_timer.stop(); self.search_timer.start(300)  # 300ms debounce
 
-    def _emit_search_changed(self): self.search_changed.emit(self.search_input.text())
+    def _emit_search_changed(self):
+        text = self.search_input.text()
+        if text == self._last_emitted: return
+        self._last_emitted = text
+        self.search_changed.emit(text)
 
     def clear_search(self): self.search_input.clear()  # This will trigger textChanged -> search_changed
\ No newline at end of file
@@ -53,6 +53,10 @@ class WelcomeDialog(QtWidgets.QDialog):
         recent_files_layout = QtWidgets.QVBoxLayout()
         
         self.recent_files_list = QtWidgets.QListWidget()
+        # Every entry is a single line of text: lay them out without per-item size queries
+        self.recent_files_list.setUniformItemSizes(True)
+        self.recent_files_list.setLayoutMode(QtWidgets.QListView.Batched)
+        self.recent_files_list.setBatchSize(50)
         if self.recent_files:
             self.recent_files_list.addItems(self.recent_files)
         else: